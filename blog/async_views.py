@@ -0,0 +1,74 @@
+"""
+ASGI-native variants of the hot read endpoints (see blog_project.async_api).
+
+They return the same payloads as PostViewSet.list / retrieve / comments, but run on the
+event loop, so slow clients do not tie up a worker thread.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+from rest_framework.exceptions import NotFound
+
+from blog_project.async_api import AsyncAPIView, AsyncPageNumberPagination
+from .models import Post
+from .serializers import PostSerializer, CommentSerializer
+from .viewcounts import arecord_view
+from .threads import parse_reply_depth, root_comments, subtree_queryset, nest_comments
+
+
+def post_detail_cache_key(post_id):
+    return f'blog:post-detail:{post_id}'
+
+
+def post_queryset():
+    return (
+        Post.objects.select_related('author', 'category')
+        .prefetch_related('tags')
+        .annotate(likes_total=Count('likes', distinct=True))
+        .order_by('-created_at')
+    )
+
+
+class AsyncPostListView(AsyncAPIView):
+    """GET /api/blog/async/posts/ - paginated feed, newest first."""
+
+    async def get(self, request):
+        paginator = AsyncPageNumberPagination()
+        posts = await paginator.paginate(request, post_queryset())
+        return self.respond(paginator.get_response_data(PostSerializer(posts, many=True).data))
+
+
+class AsyncPostDetailView(AsyncAPIView):
+    """
+    GET /api/blog/async/posts/{id}/ - single post. The serialized payload is cached for
+    BLOG_ASYNC_CACHE_TIMEOUT seconds and evicted by blog.signals when the post changes.
+    """
+
+    async def get(self, request, pk):
+        key = post_detail_cache_key(pk)
+        data = await cache.aget(key)
+        if data is None:
+            try:
+                post = await post_queryset().aget(pk=pk)
+            except Post.DoesNotExist:
+                raise NotFound('No Post matches the given query.')
+            data = PostSerializer(post).data
+            await cache.aset(key, data, getattr(settings, 'BLOG_ASYNC_CACHE_TIMEOUT', 30))
+        await arecord_view(pk, request.user, request.META)
+        return self.respond(data)
+
+
+class AsyncPostCommentsView(AsyncAPIView):
+    """
+    GET /api/blog/async/posts/{id}/comments/ - paginated top-level comments with their
+    replies, newest first (same ?depth= and ?thread= parameters as PostViewSet.comments).
+    """
+
+    async def get(self, request, pk):
+        if not await Post.objects.filter(pk=pk).aexists():
+            raise NotFound('No Post matches the given query.')
+        depth = parse_reply_depth(request.GET.get('depth'))
+        paginator = AsyncPageNumberPagination()
+        roots = await paginator.paginate(request, root_comments(pk, thread=request.GET.get('thread')))
+        comments = [comment async for comment in subtree_queryset(pk, roots, depth=depth)]
+        return self.respond(paginator.get_response_data(nest_comments(roots, CommentSerializer(comments, many=True).data)))
@@ -0,0 +1,71 @@
+"""
+Bulk write paths used by content imports.
+"""
+from collections import Counter
+
+from django.conf import settings
+from django.db import transaction
+from rest_framework.exceptions import ValidationError
+
+from .models import Post
+from .serializers import PostBulkSerializer
+from .counters import adjust_tag_counts, adjust_category_counts, record_tag_activity
+from .timelines import schedule_fan_out
+
+
+def bulk_batch_size():
+    return getattr(settings, 'BLOG_BULK_BATCH_SIZE', 500)
+
+
+def bulk_create_posts(author, items, context=None):
+    """
+    Validates `items` with one PostBulkSerializer instance and inserts every valid item.
+    The categories and tags the items refer to are loaded once, by id, before validation.
+
+    Posts are written with `bulk_create`, tag links with a single bulk insert into the
+    Post.tags through table, and the tag/category counters with one UPDATE per distinct delta.
+    The timeline fan-out is scheduled for after the commit.
+    Returns (created_ids, errors) where errors is a list of {'index': i, 'errors': {...}}
+    for the items that failed validation.
+    """
+    child = PostBulkSerializer(context=context or {})
+    #* one SELECT each for the categories and tags the items refer to
+    items_with_fields = [item for item in items if isinstance(item, dict)]
+    child.fields['category'].preload(item.get('category') for item in items_with_fields)
+    child.fields['tags'].child_relation.preload(
+        tag for item in items_with_fields if isinstance(item.get('tags'), list) for tag in item['tags']
+    )
+    valid, errors = [], []
+    for index, item in enumerate(items):
+        try:
+            valid.append(child.run_validation(item))
+        except ValidationError as exc:
+            errors.append({'index': index, 'errors': exc.detail})
+
+    if not valid:
+        return [], errors
+
+    posts, tag_lists = [], []
+    for data in valid:
+        tag_lists.append(data.pop('tags', []))
+        posts.append(Post(author=author, **data))
+
+    Through = Post.tags.through
+    batch_size = bulk_batch_size()
+    with transaction.atomic():
+        Post.objects.bulk_create(posts, batch_size=batch_size)
+        links = {
+            (post.pk, tag.pk)
+            for post, tags in zip(posts, tag_lists)
+            for tag in tags
+        }
+        Through.objects.bulk_create(
+            [Through(post_id=post_id, tag_id=tag_id) for post_id, tag_id in links],
+            batch_size=batch_size,
+        )
+        tag_counts = Counter(tag_id for _, tag_id in links)
+        adjust_tag_counts(tag_counts)
+        adjust_category_counts(Counter(post.category_id for post in posts))
+        record_tag_activity(tag_counts)
+        schedule_fan_out(post.pk for post in posts)
+    return [post.pk for post in posts], errors
@@ -0,0 +1,113 @@
+"""
+Maintained post counters for tags and categories, post view counts, comment reply counts, plus rolling tag activity buckets.
+
+The signal handlers in ``blog.signals`` and the bulk write paths call into these helpers
+so every counter update is a single ``UPDATE ... SET posts_count = posts_count + n``
+instead of a COUNT over the posts table.
+"""
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from .models import Category, Comment, Post, Tag, TagActivity
+
+
+def activity_bucket_size():
+    return timedelta(minutes=getattr(settings, 'BLOG_TRENDING_BUCKET_MINUTES', 60))
+
+
+def activity_bucket(when=None):
+    """
+    Returns the start of the activity bucket `when` falls into (buckets are aligned to the epoch).
+    """
+    when = when or timezone.now()
+    size = int(activity_bucket_size().total_seconds())
+    epoch = int(when.timestamp())
+    return datetime.fromtimestamp(epoch - epoch % size, tz=dt_timezone.utc)
+
+
+def _group_by_delta(deltas):
+    """Groups {pk: delta} into {delta: [pk, ...]} so each distinct delta is one UPDATE."""
+    grouped = defaultdict(list)
+    for pk, delta in deltas.items():
+        if pk is not None and delta:
+            grouped[delta].append(pk)
+    return grouped
+
+
+def adjust_tag_counts(deltas):
+    """
+    Applies {tag_id: delta} to Tag.posts_count.
+    """
+    for delta, tag_ids in _group_by_delta(Counter(deltas)).items():
+        Tag.objects.filter(pk__in=tag_ids).update(posts_count=F('posts_count') + delta)
+
+
+def adjust_category_counts(deltas):
+    """
+    Applies {category_id: delta} to Category.posts_count.
+    """
+    for delta, category_ids in _group_by_delta(Counter(deltas)).items():
+        Category.objects.filter(pk__in=category_ids).update(posts_count=F('posts_count') + delta)
+
+
+def adjust_view_counts(deltas):
+    """
+    Applies {post_id: delta} to Post.views_count.
+    """
+    for delta, post_ids in _group_by_delta(Counter(deltas)).items():
+        Post.objects.filter(pk__in=post_ids).update(views_count=F('views_count') + delta)
+
+
+def adjust_reply_counts(deltas):
+    """
+    Applies {comment_id: delta} to Comment.reply_count.
+    """
+    for delta, comment_ids in _group_by_delta(Counter(deltas)).items():
+        Comment.all_objects.filter(pk__in=comment_ids).update(reply_count=F('reply_count') + delta)
+
+
+_last_pruned_bucket = None
+
+
+def record_tag_activity(tag_counts, when=None):
+    """
+    Adds {tag_id: n} to the activity bucket for `when` (defaults to now).
+    Missing bucket rows are created with ``ignore_conflicts`` first, so concurrent writers
+    never race on the insert, then incremented with one UPDATE per distinct delta.
+    """
+    global _last_pruned_bucket
+    tag_counts = {tag_id: n for tag_id, n in Counter(tag_counts).items() if n > 0}
+    if not tag_counts:
+        return
+    bucket = activity_bucket(when)
+    TagActivity.objects.bulk_create(
+        [TagActivity(tag_id=tag_id, bucket=bucket, count=0) for tag_id in tag_counts],
+        ignore_conflicts=True,
+    )
+    for delta, tag_ids in _group_by_delta(tag_counts).items():
+        TagActivity.objects.filter(bucket=bucket, tag_id__in=tag_ids).update(count=F('count') + delta)
+
+    # Drop expired buckets at most once per bucket per process.
+    if _last_pruned_bucket != bucket:
+        _last_pruned_bucket = bucket
+        retention = timedelta(hours=getattr(settings, 'BLOG_TRENDING_RETENTION_HOURS', 24 * 7))
+        TagActivity.objects.filter(bucket__lt=bucket - retention).delete()
+
+
+def trending_tag_scores(hours=24, limit=10):
+    """
+    Returns [(tag_id, score), ...] ranked by tag activity over the last `hours`.
+    Only the bucket rows inside the window are aggregated.
+    """
+    since = activity_bucket(timezone.now() - timedelta(hours=hours))
+    rows = (
+        TagActivity.objects.filter(bucket__gte=since)
+        .values('tag_id')
+        .annotate(score=Sum('count'))
+        .order_by('-score', 'tag_id')[:limit]
+    )
+    return [(row['tag_id'], row['score']) for row in rows]
@@ -0,0 +1,217 @@
+"""
+Soft deletion of posts, comments and user accounts, and the background purge.
+
+Deleting a post, comment or account only stamps `deleted_at` (plus `is_active=False` for a
+user), which hides the rows at once through the default managers (see LiveManager) and
+releases the maintained counters. The rows that a cascading DELETE would have removed in
+the request are removed later by the `blog.purge_deleted` job (or `manage.py purge_deleted`),
+a bounded batch at a time: each step of `purge_step` runs one stage of PURGE_STAGES on at
+most BLOG_PURGE_BATCH_SIZE rows of its driving table, in its own short transaction.
+The stages go from the leaves to the roots, so by the time a post, comment or user is
+deleted its cascade has nothing left to collect. `purge_status` counts the work still left.
+"""
+from collections import Counter, namedtuple
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Exists, OuterRef, Q
+from django.utils import timezone
+
+from jobs.queue import enqueue
+from profiles.models import Profile
+from .models import Post, Comment, PostLike, CommentLike, TimelineEntry
+from .counters import adjust_tag_counts, adjust_category_counts, adjust_reply_counts
+from .async_views import post_detail_cache_key
+
+#* comment subtrees updated per UPDATE statement when soft-deleting many comments
+SUBTREE_CHUNK = 100
+
+
+def purge_batch_size():
+    return getattr(settings, 'BLOG_PURGE_BATCH_SIZE', 500)
+
+
+def schedule_purge():
+    """Queues the purge job once the current transaction commits (coalesced while queued)."""
+    enqueue('blog.purge_deleted', dedup_key='purge-deleted', delay=getattr(settings, 'BLOG_PURGE_DELAY_SECONDS', 5))
+
+
+def _soft_delete_posts(posts, now):
+    """
+    Hides the live posts of the `posts` queryset and releases their category and tag counters.
+    Returns the ids of the posts that were hidden.
+    """
+    posts = posts.filter(deleted_at__isnull=True)
+    post_ids = list(posts.values_list('pk', flat=True))
+    if not post_ids:
+        return []
+    category_counts = posts.values_list('category_id').annotate(n=Count('pk')).order_by()
+    tag_counts = (
+        Post.tags.through.objects.filter(post_id__in=post_ids)
+        .values_list('tag_id').annotate(n=Count('pk')).order_by()
+    )
+    adjust_category_counts({category_id: -n for category_id, n in category_counts})
+    adjust_tag_counts({tag_id: -n for tag_id, n in tag_counts})
+    Post.all_objects.filter(pk__in=post_ids).update(deleted_at=now, updated_at=now)
+    cache.delete_many([post_detail_cache_key(pk) for pk in post_ids])
+    return post_ids
+
+
+def _soft_delete_subtrees(comments, now):
+    """
+    Hides the given comments (objects with pk, post_id, path and reply_count) with all their
+    replies, and takes the hidden replies off `reply_count` of the comments above them.
+    Comments inside another given comment's subtree are covered by that subtree.
+    """
+    tops = []
+    for comment in sorted(comments, key=lambda comment: comment.path):
+        if not tops or not comment.path.startswith(tops[-1].path): #* path order puts a subtree right after its root
+            tops.append(comment)
+    hidden = 0
+    for i in range(0, len(tops), SUBTREE_CHUNK):
+        ranges = [
+            Q(post_id=top.post_id, path__gte=top.path, path__lt=top.path + '~') #* see blog.threads
+            for top in tops[i:i + SUBTREE_CHUNK]
+        ]
+        hidden += Comment.all_objects.filter(reduce(or_, ranges), deleted_at__isnull=True).update(deleted_at=now, updated_at=now)
+    if not hidden: #* already deleted
+        return 0
+    deltas = Counter()
+    for top in tops:
+        for ancestor_id in Comment.path_ids(top.path)[:-1]:
+            deltas[ancestor_id] -= 1 + top.reply_count
+    adjust_reply_counts(deltas)
+    return hidden
+
+
+def soft_delete_post(post):
+    """
+    Hides `post` (and with it its comments) right away; the rows are purged in the background.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        if _soft_delete_posts(Post.all_objects.filter(pk=post.pk), now):
+            post.deleted_at = now
+            schedule_purge()
+
+
+def soft_delete_comment(comment):
+    """
+    Hides `comment` and its replies right away; the rows are purged in the background.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        if _soft_delete_subtrees([comment], now):
+            comment.deleted_at = now
+            schedule_purge()
+
+
+def soft_delete_user(user):
+    """
+    Deactivates `user` and hides their profile, posts and comments right away. The account
+    itself is deleted by the purge once everything it owns is gone.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        user.is_active = False
+        user.save(update_fields=['is_active']) #* post_save drops the cached JWT user
+        Profile.all_objects.filter(user=user).update(deleted_at=now, updated_at=now)
+        _soft_delete_posts(Post.all_objects.filter(author=user), now)
+        _soft_delete_subtrees(
+            Comment.objects.filter(author=user).only('pk', 'post_id', 'path', 'reply_count'), now,
+        )
+        schedule_purge()
+
+
+def _deleted_posts():
+    return Post.all_objects.filter(deleted_at__isnull=False).values('pk')
+
+
+def _deleted_comments():
+    return Comment.all_objects.filter(deleted_at__isnull=False).values('pk')
+
+
+def _deleted_users():
+    return Profile.all_objects.filter(deleted_at__isnull=False).values('user_id')
+
+
+Following = Profile.following.through
+
+# `get_queryset` returns the rows a stage works on; `mark` stages stamp deleted_at on a batch of
+# them instead of deleting it. Querysets with an order are processed in that order.
+PurgeStage = namedtuple('PurgeStage', ['name', 'get_queryset', 'mark'])
+
+PURGE_STAGES = [
+    #* hidden through their post, marked so they are purged (and skipped by the reply counters) below
+    PurgeStage('comments of deleted posts', lambda: Comment.all_objects.filter(deleted_at__isnull=True, post_id__in=_deleted_posts()), True),
+    PurgeStage('comment likes', lambda: CommentLike.objects.filter(comment_id__in=_deleted_comments()), False),
+    #* deepest first: a batch always holds a comment's replies too, so the cascade stays inside it
+    PurgeStage('comments', lambda: Comment.all_objects.filter(deleted_at__isnull=False).order_by('-path'), False),
+    PurgeStage('post likes', lambda: PostLike.objects.filter(post_id__in=_deleted_posts()), False),
+    PurgeStage('timeline entries', lambda: TimelineEntry.objects.filter(post_id__in=_deleted_posts()), False),
+    #* a post deleted after the comment stages ran waits for the next round instead of cascading to its comments
+    PurgeStage('posts', lambda: Post.all_objects.filter(deleted_at__isnull=False).exclude(
+        Exists(Comment.all_objects.filter(post_id=OuterRef('pk')))
+    ), False),
+    PurgeStage('likes by deleted users', lambda: PostLike.objects.filter(user_id__in=_deleted_users()), False),
+    PurgeStage('comment likes by deleted users', lambda: CommentLike.objects.filter(user_id__in=_deleted_users()), False),
+    PurgeStage('timelines of deleted users', lambda: TimelineEntry.objects.filter(user_id__in=_deleted_users()), False),
+    PurgeStage('follows of deleted users', lambda: Following.objects.filter(
+        Q(from_profile__deleted_at__isnull=False) | Q(to_profile__deleted_at__isnull=False)
+    ), False),
+    #* their posts and comments were hidden with the account, so by now they are purged
+    PurgeStage('users', lambda: User.objects.filter(pk__in=_deleted_users()).exclude(
+        Exists(Post.all_objects.filter(author_id=OuterRef('pk')))
+    ).exclude(Exists(Comment.all_objects.filter(author_id=OuterRef('pk')))), False),
+]
+
+
+def purge_status():
+    """Returns {stage name: rows left} for the stages that still have work."""
+    status = {}
+    for stage in PURGE_STAGES:
+        left = stage.get_queryset().count()
+        if left:
+            status[stage.name] = left
+    return status
+
+
+def purge_step(batch_size=None):
+    """
+    Runs one batch of the first stage that has work left.
+    Returns (stage name, rows processed), or None when there is nothing left to purge.
+    """
+    batch_size = batch_size or purge_batch_size()
+    for stage in PURGE_STAGES:
+        with transaction.atomic():
+            queryset = stage.get_queryset()
+            pks = list(queryset.values_list('pk', flat=True)[:batch_size])
+            if not pks:
+                continue
+            batch = queryset.model._base_manager.filter(pk__in=pks)
+            if stage.mark:
+                batch.update(deleted_at=timezone.now())
+            else:
+                batch.delete()
+        return stage.name, len(pks)
+    return None
+
+
+def purge_deleted(batch_size=None, max_batches=None):
+    """
+    Runs purge batches until nothing is left or `max_batches` ran.
+    Returns ({stage name: rows processed}, finished).
+    """
+    processed = Counter()
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        step = purge_step(batch_size)
+        if step is None:
+            return dict(processed), True
+        processed[step[0]] += step[1]
+        batches += 1
+    return dict(processed), False
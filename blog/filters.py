@@ -0,0 +1,31 @@
+import django_filters
+
+from .models import Post
+from .slugs import category_slugs, tag_slugs
+
+
+class PostFilter(django_filters.FilterSet):
+    """
+    Same query parameters as the former `filterset_fields`, but the slugs are resolved to ids
+    in memory (blog.slugs) so the posts query filters on integer keys instead of joining the
+    category and tag tables.
+    """
+    category__slug = django_filters.CharFilter(method='filter_category_slug', label='Category slug')
+    tags__slug = django_filters.CharFilter(method='filter_tag_slug', label='Tag slug')
+
+    class Meta:
+        model = Post
+        fields = ['category__slug', 'tags__slug', 'author__username']
+
+    def filter_category_slug(self, queryset, name, value):
+        category_id = category_slugs.resolve(value)
+        if category_id is None:
+            return queryset.none()
+        return queryset.filter(category_id=category_id)
+
+    def filter_tag_slug(self, queryset, name, value):
+        tag_id = tag_slugs.resolve(value)
+        if tag_id is None:
+            return queryset.none()
+        #* a semi-join on the indexed tag_id column of the through table: no duplicate rows, no tag table
+        return queryset.filter(pk__in=Post.tags.through.objects.filter(tag_id=tag_id).values('post_id'))
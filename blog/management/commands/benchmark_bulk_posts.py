@@ -0,0 +1,74 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from blog.models import Category, Tag
+from blog.views import PostViewSet
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Compares rows/second of POST /posts/ (one request per post) with POST /posts/bulk/. '
+        'Everything runs inside a transaction that is rolled back, so no data is kept.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=1000, help='Number of posts per run.')
+        parser.add_argument('--tags', type=int, default=3, help='Tags attached to every post.')
+
+    def _payloads(self, count, category, tags):
+        tag_ids = [tag.pk for tag in tags]
+        return [
+            {'title': f'Benchmark post {i}', 'content': 'Lorem ipsum ' * 20, 'category': category.pk, 'tags': tag_ids}
+            for i in range(count)
+        ]
+
+    def _run(self, label, func):
+        try:
+            with transaction.atomic():
+                user = User.objects.create_user(username='bulk-benchmark')
+                category = Category.objects.create(name='bulk-benchmark', slug='bulk-benchmark')
+                tags = [Tag.objects.create(name=f'bulk-benchmark-{i}', slug=f'bulk-benchmark-{i}') for i in range(self.tag_count)]
+                payloads = self._payloads(self.count, category, tags)
+                started = time.perf_counter()
+                func(user, payloads)
+                elapsed = time.perf_counter() - started
+                raise _Rollback
+        except _Rollback:
+            pass
+        self.stdout.write(f'{label:<12} {self.count} posts in {elapsed:.3f}s -> {self.count / elapsed:,.0f} rows/s')
+        return elapsed
+
+    def handle(self, *args, **options):
+        self.count, self.tag_count = options['count'], options['tags']
+        if self.count < 1:
+            raise CommandError('--count must be positive.')
+        factory = APIRequestFactory()
+        create_view = PostViewSet.as_view({'post': 'create'}, throttle_classes=[]) #* measure the write path, not the rate limit
+        bulk_view = PostViewSet.as_view({'post': 'bulk'}) #* a few post_bulk tokens per run
+
+        def single(user, payloads):
+            for payload in payloads:
+                request = factory.post('/api/blog/posts/', payload, format='json')
+                force_authenticate(request, user=user)
+                response = create_view(request)
+                if response.status_code != 201:
+                    raise CommandError(f'Single create failed: {response.data}')
+
+        def bulk(user, payloads):
+            request = factory.post('/api/blog/posts/bulk/', payloads, format='json')
+            force_authenticate(request, user=user)
+            response = bulk_view(request)
+            if response.status_code != 201:
+                raise CommandError(f'Bulk create failed: {response.data}')
+
+        single_elapsed = self._run('single', single)
+        bulk_elapsed = self._run('bulk', bulk)
+        self.stdout.write(self.style.SUCCESS(f'bulk is {single_elapsed / bulk_elapsed:.1f}x faster'))
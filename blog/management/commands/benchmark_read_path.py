@@ -0,0 +1,74 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.test import AsyncClient, Client, override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Compares throughput of GET /posts/{id}/ on the WSGI path (DRF viewset, one worker thread per '
+        'in-flight request) with GET /async/posts/{id}/ on the ASGI path, under slow clients. '
+        'A slow client is modelled as a delay after each response, during which a WSGI worker thread '
+        'stays busy writing the response while the event loop is free to serve other connections. '
+        'The async detail cache is switched off for the run, so both sides serialize every response.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=400, help='Requests per run.')
+        parser.add_argument('--connections', type=int, default=100, help='Concurrent client connections.')
+        parser.add_argument('--threads', type=int, default=8, help='WSGI worker threads.')
+        parser.add_argument('--client-delay', type=float, default=0.05, help='Seconds each slow client takes to read a response.')
+
+    def _report(self, label, count, elapsed):
+        self.stdout.write(f'{label:<5} {count} requests in {elapsed:.2f}s -> {count / elapsed:,.0f} req/s')
+        return count / elapsed
+
+    def _run_wsgi(self, url, headers, options):
+        def fetch(_):
+            response = Client(headers=headers).get(url)
+            assert response.status_code == 200, response.status_code
+            time.sleep(options['client_delay'])
+
+        workers = min(options['threads'], options['connections'])
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(fetch, range(options['requests'])))
+        return time.perf_counter() - started
+
+    def _run_asgi(self, url, headers, options):
+        async def main():
+            client = AsyncClient()
+            slots = asyncio.Semaphore(options['connections'])
+
+            async def fetch():
+                async with slots:
+                    response = await client.get(url, headers=headers)
+                    assert response.status_code == 200, response.status_code
+                    await asyncio.sleep(options['client_delay'])
+
+            started = time.perf_counter()
+            await asyncio.gather(*(fetch() for _ in range(options['requests'])))
+            return time.perf_counter() - started
+
+        return asyncio.run(main())
+
+    def handle(self, *args, **options):
+        user = User.objects.create_user(username=f'read-benchmark-{time.time_ns()}')
+        post = Post.objects.create(author=user, title='Read benchmark', content='Lorem ipsum ' * 50)
+        headers = {'Authorization': f'Bearer {AccessToken.for_user(user)}'}
+        try:
+            #* without the cache the ASGI side does the same work as the DRF retrieve it is compared with
+            with override_settings(ALLOWED_HOSTS=['testserver'], BLOG_ASYNC_CACHE_TIMEOUT=0):
+                wsgi = self._run_wsgi(f'/api/blog/posts/{post.pk}/', headers, options)
+                asgi = self._run_asgi(f'/api/blog/async/posts/{post.pk}/', headers, options)
+        finally:
+            user.delete()
+        wsgi_rate = self._report('wsgi', options['requests'], wsgi)
+        asgi_rate = self._report('asgi', options['requests'], asgi)
+        self.stdout.write(self.style.SUCCESS(f'asgi/wsgi throughput: {asgi_rate / wsgi_rate:.1f}x'))
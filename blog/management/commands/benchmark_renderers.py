@@ -0,0 +1,89 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from blog.models import Category, Post, Tag
+from blog.views import PostViewSet
+from blog_project import middleware
+from blog_project.renderers import FastJSONRenderer, orjson
+from profiles.views import ProfileViewSet
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Reports CPU time and bytes on the wire for the GET /posts/ and GET /profiles/ payloads: '
+        'rendering with DRF\'s JSONRenderer vs blog_project.renderers.FastJSONRenderer, then '
+        'gzip/Brotli compression as done by blog_project.middleware.CompressionMiddleware. '
+        'Sample data is created inside a transaction that is rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=200, help='Posts in the list payload.')
+        parser.add_argument('--profiles', type=int, default=200, help='Profiles in the list payload.')
+        parser.add_argument('--repeat', type=int, default=50, help='Timed iterations per measurement.')
+
+    def _cpu(self, func, repeat):
+        started = time.process_time()
+        for _ in range(repeat):
+            result = func()
+        return (time.process_time() - started) / repeat * 1000, result
+
+    def _payloads(self, options):
+        users = [User.objects.create_user(username=f'render-benchmark-{i}') for i in range(max(options['profiles'], 1))]
+        for user in users:
+            user.profile.bio = 'Writes about Django, APIs and performance. ' * 3
+            user.profile.save()
+        category = Category.objects.create(name='render-benchmark', slug='render-benchmark')
+        tags = [Tag.objects.create(name=f'render-benchmark-{i}', slug=f'render-benchmark-{i}') for i in range(3)]
+        posts = Post.objects.bulk_create(
+            Post(title=f'Benchmark post {i}', content='Lorem ipsum dolor sit amet. ' * 40, author=users[i % len(users)], category=category)
+            for i in range(options['posts'])
+        )
+        Post.tags.through.objects.bulk_create(Post.tags.through(post_id=post.pk, tag_id=tag.pk) for post in posts for tag in tags)
+
+        factory = APIRequestFactory()
+        payloads = {}
+        for label, view, path in [
+            ('posts', PostViewSet.as_view({'get': 'list'}, pagination_class=None), '/api/blog/posts/'),
+            ('profiles', ProfileViewSet.as_view({'get': 'list'}), '/api/profiles/'),
+        ]:
+            request = factory.get(path)
+            force_authenticate(request, user=users[0])
+            response = view(request)
+            if response.status_code != 200:
+                raise CommandError(f'GET {path} failed: {response.status_code}')
+            payloads[label] = response.data
+        return payloads
+
+    def handle(self, *args, **options):
+        if min(options['posts'], options['profiles'], options['repeat']) < 1:
+            raise CommandError('--posts, --profiles and --repeat must be positive.')
+        try:
+            with transaction.atomic():
+                payloads = self._payloads(options)
+                raise _Rollback
+        except _Rollback:
+            pass
+
+        repeat = options['repeat']
+        settings = middleware.compression_settings()
+        self.stdout.write(f'orjson: {"yes" if orjson else "no (stdlib fallback)"}, brotli: {"yes" if middleware.brotli else "no"}')
+        for label, data in payloads.items():
+            self.stdout.write(f'\n{label} ({len(data)} items)')
+            drf_ms, drf_body = self._cpu(lambda: JSONRenderer().render(data), repeat)
+            fast_ms, fast_body = self._cpu(lambda: FastJSONRenderer().render(data), repeat)
+            if drf_body != fast_body:
+                raise CommandError(f'FastJSONRenderer output differs from JSONRenderer for {label}.')
+            self.stdout.write(f'  render  drf     {drf_ms:8.3f} ms cpu  {len(drf_body):>10,} bytes')
+            self.stdout.write(f'  render  fast    {fast_ms:8.3f} ms cpu  {len(fast_body):>10,} bytes  ({drf_ms / fast_ms:.1f}x faster)')
+            for encoding in ['gzip', 'br'] if middleware.brotli else ['gzip']:
+                ms, body = self._cpu(lambda: middleware.compress(fast_body, encoding, settings), repeat)
+                self.stdout.write(f'  encode  {encoding:<7} {ms:8.3f} ms cpu  {len(body):>10,} bytes  ({len(body) / len(fast_body):.0%} of identity)')
@@ -0,0 +1,64 @@
+import time
+
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from rest_framework.throttling import UserRateThrottle
+
+from blog.throttling import LikeThrottle, memory_buckets
+
+
+class _DRFLikeThrottle(UserRateThrottle):
+    scope = 'like'
+
+
+class Command(BaseCommand):
+    help = (
+        'Measures the cost of one throttle check for POST /posts/{id}/like/ with the in-memory '
+        'token buckets, the shared-cache counters and DRF\'s timestamp-history UserRateThrottle. '
+        'Exits with an error when a blog.throttling store exceeds --max-us.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--checks', type=int, default=50000, help='Throttle checks per run.')
+        parser.add_argument('--users', type=int, default=1000, help='Distinct users the checks are spread over.')
+        parser.add_argument('--max-us', type=float, default=50.0, help='Allowed microseconds per check.')
+
+    def _requests(self, count, users):
+        factory = APIRequestFactory()
+        requests = []
+        for i in range(users):
+            request = Request(factory.post('/api/blog/posts/1/like/', REMOTE_ADDR='10.0.0.1'))
+            request.user = User(pk=i + 1) if i else AnonymousUser() #* one anonymous client, keyed by IP
+            requests.append(request)
+        return [requests[i % users] for i in range(count)]
+
+    def _run(self, label, throttle_class, requests):
+        allowed = 0
+        started = time.perf_counter()
+        for request in requests:
+            allowed += throttle_class().allow_request(request, None) #* a fresh throttle per request, like APIView
+        elapsed = time.perf_counter() - started
+        per_check = elapsed / len(requests) * 1e6
+        self.stdout.write(f'{label:<7} {per_check:8.2f} us/check ({allowed} of {len(requests)} allowed)')
+        return per_check
+
+    def handle(self, *args, **options):
+        if options['checks'] < 1 or options['users'] < 1:
+            raise CommandError('--checks and --users must be positive.')
+        requests = self._requests(options['checks'], options['users'])
+        memory_buckets.clear()
+        results = {}
+        with override_settings(BLOG_THROTTLE_STORE='memory'):
+            results['memory'] = self._run('memory', LikeThrottle, requests)
+        with override_settings(BLOG_THROTTLE_STORE='cache'):
+            results['cache'] = self._run('cache', LikeThrottle, requests)
+        self._run('drf', _DRFLikeThrottle, requests)
+        memory_buckets.clear()
+
+        too_slow = {label: value for label, value in results.items() if value > options['max_us']}
+        if too_slow:
+            raise CommandError(', '.join(f'{label}: {value:.2f}us' for label, value in too_slow.items()) + f' exceeds {options["max_us"]}us per check')
+        self.stdout.write(self.style.SUCCESS(f'All throttle stores are under {options["max_us"]}us per check.'))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from blog_project.schema import write_schema_artifacts
+
+
+class Command(BaseCommand):
+    help = (
+        'Generates the OpenAPI schema (YAML and JSON) and writes gzip-compressed artifacts '
+        'served by /api/schema/. Run it at build/deploy time.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output-dir', help='Directory for the artifacts (defaults to OPENAPI_SCHEMA_DIR).')
+
+    def handle(self, *args, **options):
+        for path in write_schema_artifacts(options['output_dir']):
+            self.stdout.write(f'Wrote {path} ({path.stat().st_size:,} bytes)')
+        self.stdout.write(self.style.SUCCESS('OpenAPI schema artifacts are up to date.'))
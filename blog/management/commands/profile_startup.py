@@ -0,0 +1,87 @@
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+#* run in a fresh interpreter so nothing is imported yet; the URLconf is loaded too because
+#* the first request of every worker pays for it
+_BOOT_SCRIPT = '''
+import time
+started = time.perf_counter()
+import {module}
+if {load_urls}:
+    from django.urls import get_resolver
+    get_resolver().url_patterns
+print(time.perf_counter() - started)
+'''
+
+
+def parse_importtime(output):
+    """
+    Parses `python -X importtime` output into [(module, self_us, cumulative_us, depth)].
+    """
+    rows = []
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        rows.append((name.strip(), int(self_us), int(cumulative_us), (len(name) - len(name.lstrip())) // 2))
+    return rows
+
+
+class Command(BaseCommand):
+    help = (
+        'Boots blog_project.wsgi / blog_project.asgi in a fresh interpreter under `python -X importtime` '
+        'and reports total boot time plus the most expensive modules and packages. '
+        'With --max-seconds it fails when the boot is slower, so it can gate CI on cold-start time.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--target', choices=['wsgi', 'asgi', 'both'], default='both')
+        parser.add_argument('--runs', type=int, default=3, help='Cold boots per target; the fastest one is reported.')
+        parser.add_argument('--top', type=int, default=15, help='Modules and packages to list.')
+        parser.add_argument('--no-urls', action='store_true', help='Do not load the URLconf (it is normally loaded by the first request).')
+        parser.add_argument('--max-seconds', type=float, default=None, help='Fail if a boot takes longer than this.')
+
+    def _boot(self, module, load_urls):
+        env = {**os.environ, 'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'blog_project.settings')}
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', _BOOT_SCRIPT.format(module=module, load_urls=load_urls)],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+        )
+        if result.returncode != 0:
+            raise CommandError(f'Booting {module} failed:\n{result.stderr[-2000:]}')
+        return float(result.stdout.strip().splitlines()[-1]), parse_importtime(result.stderr)
+
+    def _report(self, module, seconds, rows, top):
+        self.stdout.write(self.style.MIGRATE_HEADING(f'{module}: {seconds * 1000:.0f} ms boot, {len(rows)} modules imported'))
+        self.stdout.write(f'  {"cumulative ms":>13} {"self ms":>8}  module')
+        for name, self_us, cumulative_us, depth in sorted(rows, key=lambda row: -row[2])[:top]:
+            self.stdout.write(f'  {cumulative_us / 1000:13.1f} {self_us / 1000:8.1f}  {"  " * min(depth, 6)}{name}')
+        packages = defaultdict(int)
+        for name, self_us, _, _ in rows:
+            packages[name.split('.')[0]] += self_us
+        self.stdout.write(f'  {"self ms":>13}  package (sum over its modules)')
+        for package, self_us in sorted(packages.items(), key=lambda item: -item[1])[:top]:
+            self.stdout.write(f'  {self_us / 1000:13.1f}  {package}')
+
+    def handle(self, *args, **options):
+        if options['runs'] < 1:
+            raise CommandError('--runs must be positive.')
+        targets = ['wsgi', 'asgi'] if options['target'] == 'both' else [options['target']]
+        slowest = 0.0
+        for target in targets:
+            module = f'blog_project.{target}'
+            boots = [self._boot(module, load_urls=not options['no_urls']) for _ in range(options['runs'])]
+            seconds, rows = min(boots, key=lambda boot: boot[0])
+            self._report(module, seconds, rows, options['top'])
+            slowest = max(slowest, seconds)
+
+        max_seconds = options['max_seconds']
+        if max_seconds is not None:
+            if slowest > max_seconds:
+                raise CommandError(f'Cold start took {slowest:.3f}s, over the {max_seconds:.3f}s budget.')
+            self.stdout.write(self.style.SUCCESS(f'Cold start {slowest:.3f}s is within the {max_seconds:.3f}s budget.'))
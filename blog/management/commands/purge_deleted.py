@@ -0,0 +1,52 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.deletion import purge_batch_size, purge_status, purge_step
+
+
+class Command(BaseCommand):
+    help = (
+        'Physically deletes soft-deleted posts, comments and user accounts (plus their likes, timeline '
+        'entries and follows) in bounded batches, printing progress as it goes. The purge job does the '
+        'same in the background; use this to drain a backlog or with --status to see what is left.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None, help='Rows per batch (defaults to BLOG_PURGE_BATCH_SIZE).')
+        parser.add_argument('--max-batches', type=int, default=None, help='Stop after this many batches.')
+        parser.add_argument('--pause', type=float, default=0.0, help='Seconds to sleep between batches, to leave room for live traffic.')
+        parser.add_argument('--status', action='store_true', help='Only report the rows left to purge.')
+
+    def _report_status(self):
+        status = purge_status()
+        if not status:
+            self.stdout.write('Nothing left to purge.')
+        for stage, rows in status.items():
+            self.stdout.write(f'  {rows:>10,}  {stage}')
+        return status
+
+    def handle(self, *args, **options):
+        if options['status']:
+            self._report_status()
+            return
+        batch_size = options['batch_size'] or purge_batch_size()
+        if batch_size < 1:
+            raise CommandError('--batch-size must be positive.')
+        batches = rows = 0
+        started = time.perf_counter()
+        while options['max_batches'] is None or batches < options['max_batches']:
+            step = purge_step(batch_size)
+            if step is None:
+                break
+            batches += 1
+            rows += step[1]
+            self.stdout.write(f'Batch {batches}: {step[1]:,} {step[0]}')
+            if options['pause']:
+                time.sleep(options['pause'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Purged {rows:,} rows in {batches} batch(es), {time.perf_counter() - started:.1f}s.'
+        ))
+        if options['max_batches'] is not None and batches == options['max_batches']:
+            self.stdout.write('Stopped at --max-batches; left to purge:')
+            self._report_status()
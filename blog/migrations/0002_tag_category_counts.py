@@ -0,0 +1,47 @@
+# Generated by Django 5.2.6 on 2026-10-19 08:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_posts_count(apps, schema_editor):
+    Category = apps.get_model('blog', 'Category')
+    Tag = apps.get_model('blog', 'Tag')
+    for model, lookup in ((Category, 'posts'), (Tag, 'posts')):
+        counted = model.objects.annotate(n=models.Count(lookup)).values_list('pk', 'n')
+        for pk, n in counted.iterator():
+            if n:
+                model.objects.filter(pk=pk).update(posts_count=n)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='posts_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='tag',
+            name='posts_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.CreateModel(
+            name='TagActivity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.DateTimeField(db_index=True)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('tag', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='activity', to='blog.tag')),
+            ],
+            options={
+                'unique_together': {('tag', 'bucket')},
+            },
+        ),
+        migrations.RunPython(backfill_posts_count, migrations.RunPython.noop),
+    ]
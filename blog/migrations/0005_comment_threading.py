@@ -0,0 +1,67 @@
+# Generated by Django 5.2.6 on 2026-10-19 08:30
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_comment_paths(apps, schema_editor):
+    """Existing comments become thread roots: path = own id in 7-digit base36."""
+    Comment = apps.get_model('blog', 'Comment')
+
+    def segment(pk):
+        digits = ''
+        while pk:
+            pk, digit = divmod(pk, 36)
+            digits = '0123456789abcdefghijklmnopqrstuvwxyz'[digit] + digits
+        return digits.rjust(7, '0')
+
+    batch = []
+    for comment in Comment.objects.only('pk').iterator(chunk_size=2000):
+        comment.path = segment(comment.pk)
+        batch.append(comment)
+        if len(batch) >= 2000:
+            Comment.objects.bulk_update(batch, ['path'])
+            batch = []
+    if batch:
+        Comment.objects.bulk_update(batch, ['path'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0004_timeline_entry'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='depth',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='parent',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='replies', to='blog.comment'),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='path',
+            field=models.CharField(default='', editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='reply_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['post', 'path'], name='blog_comment_post_path'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['post', 'depth', 'path'], name='blog_comment_post_depth_path'),
+        ),
+        migrations.RunPython(backfill_comment_paths, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-19 08:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0005_comment_threading'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='views_count',
+            field=models.PositiveIntegerField(db_index=True, default=0, editable=False),
+        ),
+    ]
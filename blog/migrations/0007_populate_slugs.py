@@ -0,0 +1,30 @@
+# Generated by Django 5.2.6 on 2026-10-19 08:33
+
+from django.db import migrations
+from django.utils.text import slugify
+
+
+def populate_slugs(apps, schema_editor):
+    """Gives every category and tag saved with a blank slug one derived from its name."""
+    for model_name in ('Category', 'Tag'):
+        model = apps.get_model('blog', model_name)
+        taken = set(model.objects.exclude(slug='').values_list('slug', flat=True))
+        for obj in model.objects.filter(slug=''):
+            base = (slugify(obj.name) or model_name.lower())[:94].strip('-')
+            slug, n = base, 1
+            while slug in taken:
+                n += 1
+                slug = f'{base}-{n}'
+            taken.add(slug)
+            model.objects.filter(pk=obj.pk).update(slug=slug)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0006_post_views_count'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_slugs, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-19 08:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0007_populate_slugs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, db_index=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, db_index=True, editable=False, null=True),
+        ),
+    ]
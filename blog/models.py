@@ -1,20 +1,124 @@
-from django.db import models
+from functools import reduce
+from operator import or_
+
+from django.db import models, transaction, IntegrityError
 from django.contrib.auth.models import User
+from django.utils.text import slugify
+
+
+class SlugManager(models.Manager):
+    """
+    Manager of models with an auto-generated unique `slug` (see AutoSlugMixin).
+    `bulk_create` fills in missing slugs for the whole batch with one query for the taken ones.
+    """
+    def unique_slugs(self, names, taken_query_chunk=200):
+        """
+        Returns a unique slug for each name: slugify(name), or slugify(name)-2, -3, ... when it is
+        taken in the table or earlier in `names`.
+        """
+        max_length = self.model._meta.get_field('slug').max_length
+        bases = [(slugify(name) or self.model._meta.model_name)[:max_length - 6].strip('-') for name in names]
+        taken = set()
+        distinct = sorted(set(bases))
+        for i in range(0, len(distinct), taken_query_chunk):
+            chunk = distinct[i:i + taken_query_chunk]
+            lookups = reduce(or_, (models.Q(slug=base) | models.Q(slug__startswith=f'{base}-') for base in chunk))
+            taken.update(self.filter(lookups).values_list('slug', flat=True))
+        slugs = []
+        for base in bases:
+            slug, n = base, 1
+            while slug in taken:
+                n += 1
+                slug = f'{base}-{n}'
+            taken.add(slug)
+            slugs.append(slug)
+        return slugs
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        missing = [obj for obj in objs if not obj.slug]
+        for obj, slug in zip(missing, self.unique_slugs([obj.name for obj in missing])):
+            obj.slug = slug
+        return super().bulk_create(objs, *args, **kwargs)
+
+
+class AutoSlugMixin:
+    """
+    Generates `slug` from `name` on the first save when it is left blank. If a concurrent
+    insert takes the same slug first, the next free suffix is tried.
+    """
+    slug_attempts = 3
+
+    def save(self, *args, **kwargs):
+        if self.slug:
+            return super().save(*args, **kwargs)
+        for attempt in range(self.slug_attempts):
+            self.slug = type(self)._default_manager.unique_slugs([self.name])[0]
+            try:
+                with transaction.atomic():
+                    return super().save(*args, **kwargs)
+            except IntegrityError:
+                if attempt == self.slug_attempts - 1 or type(self)._default_manager.filter(name=self.name).exists():
+                    raise #* a duplicate name, not a slug race
+                self.slug = ''
+
+
+#* marks a value that was not loaded from the database (a deferred field), see Post.from_db
+NOT_LOADED = object()
+
+
+class LiveManager(models.Manager):
+    """
+    Default manager that hides soft-deleted rows (see blog.deletion); a row is live when it
+    matches `live_lookups`. `all_objects` on the model still sees every row. The lookups are a
+    class attribute because related managers (post.comments, user.posts) subclass this one.
+    """
+    live_lookups = {'deleted_at__isnull': True}
+
+    def get_queryset(self):
+        return super().get_queryset().filter(**self.live_lookups)
+
+
+class LiveCommentManager(LiveManager):
+    #* the comments of a soft-deleted post are hidden with it, without touching their rows
+    live_lookups = {'deleted_at__isnull': True, 'post__deleted_at__isnull': True}
+
 
 # Create your models here.
-class Category(models.Model):
+class Category(AutoSlugMixin, models.Model):
     name = models.CharField(max_length=100, unique=True)
     slug = models.SlugField(max_length=100, unique=True, blank=True)
+    posts_count = models.PositiveIntegerField(default=0, editable=False) #* maintained by blog.signals
+
+    objects = SlugManager()
 
     def __str__(self):
         return self.name
     
-class Tag(models.Model):
+class Tag(AutoSlugMixin, models.Model):
     name = models.CharField(max_length=100, unique=True)
     slug = models.SlugField(max_length=100, unique=True, blank=True)
+    posts_count = models.PositiveIntegerField(default=0, editable=False) #* maintained by blog.signals
+
+    objects = SlugManager()
 
     def __str__(self):
         return self.name
+
+class TagActivity(models.Model):
+    """
+    Number of times a tag was attached to a post inside one rolling time bucket.
+    Trending tags are ranked by summing the few buckets inside the requested window.
+    """
+    tag = models.ForeignKey(Tag, on_delete=models.CASCADE, related_name='activity')
+    bucket = models.DateTimeField(db_index=True)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('tag', 'bucket')
+
+    def __str__(self):
+        return f"{self.tag.name} @ {self.bucket:%Y-%m-%d %H:%M}: {self.count}"
     
 class Post(models.Model):
     author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='posts')
@@ -23,33 +127,109 @@ class Post(models.Model):
     category = models.ForeignKey(Category, on_delete=models.SET_NULL, null=True, related_name='posts')
     tags = models.ManyToManyField(Tag, related_name='posts', blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True) #* incremental exports filter on it
+    views_count = models.PositiveIntegerField(default=0, editable=False, db_index=True) #* flushed in batches by blog.viewcounts
+    deleted_at = models.DateTimeField(null=True, blank=True, editable=False, db_index=True) #* soft delete, purged by blog.deletion
+
+    objects = LiveManager()
+    all_objects = models.Manager()
 
     def __str__(self):
         return self.title
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        #* lets signals detect category reassignment; unknown when category_id was deferred (.only()/.defer())
+        instance._loaded_category_id = instance.__dict__.get('category_id', NOT_LOADED) # type: ignore
+        return instance
     
     @property # Lets us access likes count method as an attribute
     def likes_count(self):
         return self.likes.count() # type: ignore  #* reference to related_name in PostLike
     
 class Comment(models.Model):
+    """
+    A comment or a reply. Threads are stored as a materialized path: `path` is the path of the
+    parent followed by this comment's id in fixed-width base36, so a comment's whole subtree is
+    the range [path, path + '~') of the (post, path) index and sorts in thread order.
+    `reply_count` is the number of replies in the subtree, maintained by blog.signals.
+    """
+    PATH_STEP = 7 #* base36 digits per level: ids up to 36**7 (~78 billion)
+    MAX_DEPTH = 255 // PATH_STEP - 1
+
     post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='comments')
     author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='comments')
+    parent = models.ForeignKey('self', on_delete=models.CASCADE, null=True, blank=True, related_name='replies')
     content = models.TextField()
+    path = models.CharField(max_length=255, editable=False, default='')
+    depth = models.PositiveSmallIntegerField(default=0, editable=False)
+    reply_count = models.PositiveIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True) #* incremental exports filter on it
+    deleted_at = models.DateTimeField(null=True, blank=True, editable=False, db_index=True) #* soft delete, purged by blog.deletion
+
+    objects = LiveCommentManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['post', 'path'], name='blog_comment_post_path'),
+            models.Index(fields=['post', 'depth', 'path'], name='blog_comment_post_depth_path'),
+        ]
 
     def __str__(self):
         return f"Comment by {self.author.username}"
+
+    @classmethod
+    def path_segment(cls, pk):
+        digits = ''
+        while pk:
+            pk, digit = divmod(pk, 36)
+            digits = '0123456789abcdefghijklmnopqrstuvwxyz'[digit] + digits
+        return digits.rjust(cls.PATH_STEP, '0')
+
+    @classmethod
+    def path_ids(cls, path):
+        """Ids of the comments along `path`, from the thread root down."""
+        return [int(path[i:i + cls.PATH_STEP], 36) for i in range(0, len(path), cls.PATH_STEP)]
+
+    def save(self, *args, **kwargs):
+        if self.path:
+            return super().save(*args, **kwargs)
+        #* the path ends with our own id, so it is written right after the INSERT
+        with transaction.atomic():
+            if self.parent_id:
+                self.depth = self.parent.depth + 1
+            super().save(*args, **kwargs)
+            self.path = (self.parent.path if self.parent_id else '') + self.path_segment(self.pk)
+            Comment.all_objects.filter(pk=self.pk).update(path=self.path)
     
     @property  
     def likes_count(self):
         return self.likes.count() # type: ignore #* reference to related_name in CommentLike
 
+class TimelineEntry(models.Model):
+    """
+    One post in a user's materialized home timeline (posts of the people they follow).
+    Written by the fan-out in blog.timelines; `created_at` is copied from the post so a
+    page of the timeline is a single range scan over (user, created_at).
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='timeline_entries')
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='timeline_entries')
+    created_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ('user', 'post')
+        indexes = [models.Index(fields=['user', '-created_at'], name='blog_timeline_user_created')]
+
+    def __str__(self):
+        return f"{self.post_id} in {self.user_id}'s timeline" # type: ignore
+
 class PostLike(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='post_likes')
     post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='likes')
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
 
     class Meta:
         unique_together = ('user', 'post')
@@ -60,7 +240,7 @@ class PostLike(models.Model):
 class CommentLike(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='comment_likes')
     comment = models.ForeignKey(Comment, on_delete=models.CASCADE, related_name='likes')
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
 
     class Meta:
         unique_together = ('user', 'comment')
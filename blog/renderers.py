@@ -0,0 +1,68 @@
+import csv
+import json
+from django.core.serializers.json import DjangoJSONEncoder
+from rest_framework.renderers import BaseRenderer
+
+
+class _Echo:
+    """File-like object whose write() returns the value, so csv.writer can feed a generator."""
+    def write(self, value):
+        return value
+
+
+class RowStreamMixin:
+    """
+    `stream` writes rows from a sync iterator, `astream` from an async one (exports served
+    over ASGI). Subclasses provide `row_encoder(fields)` -> (header text, encode(row) -> text).
+    """
+    def stream(self, fields, rows):
+        header, encode = self.row_encoder(fields)
+        if header:
+            yield header
+        for row in rows:
+            yield encode(row)
+
+    async def astream(self, fields, rows):
+        header, encode = self.row_encoder(fields)
+        if header:
+            yield header
+        async for row in rows:
+            yield encode(row)
+
+
+class NDJSONRenderer(RowStreamMixin, BaseRenderer):
+    """
+    Streams export rows as newline-delimited JSON objects. `render` is only used for
+    error bodies; row data goes through `stream`.
+    """
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return (json.dumps(data, cls=DjangoJSONEncoder) + '\n').encode(self.charset)
+
+    def row_encoder(self, fields):
+        encoder = DjangoJSONEncoder(ensure_ascii=False)
+        return '', lambda row: encoder.encode(dict(zip(fields, row))) + '\n'
+
+
+class CSVRenderer(RowStreamMixin, BaseRenderer):
+    """
+    Streams export rows as CSV with a header line. Datetimes are written in ISO 8601,
+    like the JSON output.
+    """
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        writer = csv.writer(_Echo())
+        items = data.items() if isinstance(data, dict) else [('detail', data)]
+        return ''.join(writer.writerow([key, value]) for key, value in items).encode(self.charset)
+
+    def row_encoder(self, fields):
+        writer = csv.writer(_Echo())
+        return writer.writerow(fields), lambda row: writer.writerow(
+            [value.isoformat() if hasattr(value, 'isoformat') else value for value in row]
+        )
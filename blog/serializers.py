@@ -1,16 +1,25 @@
 from rest_framework import serializers
+from django.conf import settings
 from django.contrib.auth.models import User
 from .models import Category, Tag, Post, Comment
 
 class CategorySerializer(serializers.ModelSerializer):
     class Meta:
         model = Category
-        fields = ['id', 'name', 'slug']
+        fields = ['id', 'name', 'slug', 'posts_count']
+        read_only_fields = ['posts_count']
 
 class TagSerializer(serializers.ModelSerializer):
     class Meta:
         model = Tag
-        fields = ['id', 'name', 'slug']
+        fields = ['id', 'name', 'slug', 'posts_count']
+        read_only_fields = ['posts_count']
+
+class TrendingTagSerializer(TagSerializer):
+    score = serializers.IntegerField(read_only=True) #* tag activity inside the requested window
+
+    class Meta(TagSerializer.Meta):
+        fields = TagSerializer.Meta.fields + ['score']
 
 
 class PostSerializer(serializers.ModelSerializer):
@@ -27,8 +36,10 @@ class PostSerializer(serializers.ModelSerializer):
         - created_at (datetime): The timestamp when the post was created (read-only).
         - updated_at (datetime): The timestamp when the post was last updated (read-only).
         - likes_count (int): The number of likes the post has received (read-only).
+        - views_count (int): Distinct views of the post; recent views show up after the next flush (read-only).
     Methods:
-        - get_likes_count(obj): Returns the number of likes for the given post instance.
+        - get_likes_count(obj): Returns the number of likes for the given post instance, using the
+          `likes_total` annotation when the queryset provides it.
         - create(validated_data): Creates a new Post instance with the provided validated data,
           associates tags if provided, and sets the author to the current user.
         - update(instance, validated_data): Updates an existing Post instance with the provided
@@ -39,10 +50,12 @@ class PostSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Post
-        fields = ['id', 'author', 'title', 'content', 'category', 'tags', 'created_at', 'updated_at', 'likes_count']
-        read_only_fields = ['id', 'author', 'created_at', 'updated_at', 'likes_count']
+        fields = ['id', 'author', 'title', 'content', 'category', 'tags', 'created_at', 'updated_at', 'likes_count', 'views_count']
+        read_only_fields = ['id', 'author', 'created_at', 'updated_at', 'likes_count', 'views_count']
 
     def get_likes_count(self, obj):
+        if hasattr(obj, 'likes_total'): #* annotated by the viewsets, avoids one COUNT per row
+            return obj.likes_total
         return obj.likes_count
     
     def create(self, validated_data):
@@ -61,14 +74,97 @@ class PostSerializer(serializers.ModelSerializer):
             instance.tags.set(tags_data)
         return instance
     
+class InBulkPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    PrimaryKeyRelatedField that resolves ids from an in-memory map instead of one SELECT per
+    value. `preload(values)` fills the map with one `in_bulk()` of the ids a request uses (e.g.
+    every category of a bulk import); ids it has not seen are loaded on first use and kept.
+    """
+    MAX_ID = 2 ** 63 - 1 #* larger ints cannot even be sent to the database
+
+    def preload(self, values):
+        ids = set()
+        for value in values:
+            if isinstance(value, bool):
+                continue
+            try:
+                ids.add(int(value))
+            except (TypeError, ValueError, OverflowError):
+                continue
+        ids = {pk for pk in ids if abs(pk) <= self.MAX_ID}
+        self._instances = {**dict.fromkeys(ids), **self.get_queryset().in_bulk(ids)} #* None marks a missing id
+
+    def to_internal_value(self, data):
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            pk = int(data)
+        except (TypeError, ValueError, OverflowError): #* OverflowError: 1e999 parses as an infinite float
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        if abs(pk) > self.MAX_ID:
+            self.fail('does_not_exist', pk_value=data)
+        instances = self.__dict__.setdefault('_instances', {})
+        if pk not in instances:
+            instances[pk] = self.get_queryset().in_bulk([pk]).get(pk)
+        if instances[pk] is None:
+            self.fail('does_not_exist', pk_value=data)
+        return instances[pk]
+
+
+class PostBulkSerializer(PostSerializer):
+    """
+    Validates one item of a bulk post import. Category and tag ids are checked against
+    in-memory lookups preloaded by `blog.bulk.bulk_create_posts`, which also writes the rows.
+    """
+    category = InBulkPrimaryKeyRelatedField(queryset=Category.objects.all(), allow_null=True, required=False)
+    tags = InBulkPrimaryKeyRelatedField(queryset=Tag.objects.all(), many=True, required=False)
+
+    class Meta(PostSerializer.Meta):
+        fields = ['title', 'content', 'category', 'tags']
+
+
+class PostBulkResultSerializer(serializers.Serializer):
+    created = serializers.IntegerField()
+    ids = serializers.ListField(child=serializers.IntegerField())
+    errors = serializers.ListField(child=serializers.DictField())
+
+    
 class CommentSerializer(serializers.ModelSerializer):
     author_username = serializers.CharField(source='author.username', read_only=True)
     likes_count = serializers.SerializerMethodField()
 
     class Meta:
         model = Comment
-        fields = ['id', 'post', 'author', 'author_username', 'content', 'created_at', 'updated_at', 'likes_count']
-        read_only_fields = ['id', 'post', 'author', 'author_username', 'created_at', 'updated_at', 'likes_count']
+        fields = [
+            'id', 'post', 'parent', 'author', 'author_username', 'content', 'depth', 'reply_count',
+            'created_at', 'updated_at', 'likes_count',
+        ]
+        read_only_fields = ['id', 'post', 'author', 'author_username', 'depth', 'reply_count', 'created_at', 'updated_at', 'likes_count']
+
+    def validate(self, attrs):
+        parent = attrs.get('parent')
+        if self.instance is not None:
+            if 'parent' in attrs and parent != self.instance.parent:
+                raise serializers.ValidationError({'parent': 'A comment cannot be moved to another thread.'})
+            return attrs
+        if parent is not None:
+            post = self.context.get('post') #* set by PostViewSet.comments
+            if post is not None and parent.post_id != post.pk:
+                raise serializers.ValidationError({'parent': 'The parent comment belongs to another post.'})
+            max_depth = min(getattr(settings, 'BLOG_COMMENT_MAX_DEPTH', 20), Comment.MAX_DEPTH)
+            if parent.depth >= max_depth:
+                raise serializers.ValidationError({'parent': f'Replies can be nested at most {max_depth} levels deep.'})
+        return attrs
 
     def get_likes_count(self, obj):
-        return obj.likes_count
\ No newline at end of file
+        if hasattr(obj, 'likes_total'):
+            return obj.likes_total
+        return obj.likes_count
+
+
+class CommentThreadSerializer(CommentSerializer):
+    """Schema of a comment returned with its nested replies (see blog.threads.nest_comments)."""
+    replies = serializers.ListField(child=serializers.DictField(), read_only=True)
+
+    class Meta(CommentSerializer.Meta):
+        fields = CommentSerializer.Meta.fields + ['replies']
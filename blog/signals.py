@@ -0,0 +1,136 @@
+from django.core.cache import cache
+from django.db.models import F
+from django.db.models.signals import post_save, pre_delete, post_delete, m2m_changed
+from django.dispatch import receiver
+from .models import Category, Tag, Post, PostLike, Comment, NOT_LOADED
+from .counters import adjust_tag_counts, adjust_category_counts, record_tag_activity
+from .async_views import post_detail_cache_key
+from .timelines import schedule_fan_out
+from .slugs import RESOLVERS
+
+@receiver(post_save, sender=Post)
+def track_post_category(sender, instance, created, raw=False, **kwargs):
+    """
+    Keeps Category.posts_count in sync when a post is created or moved to another category.
+    The category a post was loaded with is remembered by `Post.from_db`, so detecting a
+    reassignment costs no extra query.
+    """
+    if raw:
+        return
+    if created:
+        adjust_category_counts({instance.category_id: 1})
+    else:
+        old_category_id = getattr(instance, '_loaded_category_id', NOT_LOADED)
+        if old_category_id is not NOT_LOADED and old_category_id != instance.category_id:
+            adjust_category_counts({old_category_id: -1, instance.category_id: 1})
+    instance._loaded_category_id = instance.__dict__.get('category_id', NOT_LOADED) #* reading a deferred field would query
+
+
+@receiver(post_save, sender=Post)
+def fan_out_new_post(sender, instance, created, raw=False, **kwargs):
+    """
+    Copies a new post into its author's followers' timelines once the transaction commits.
+    """
+    if created and not raw:
+        schedule_fan_out([instance.pk])
+
+
+@receiver(pre_delete, sender=Post)
+def release_post_tags(sender, instance, **kwargs):
+    """
+    Deleting a post removes its tag links through the cascade, which does not send
+    `m2m_changed`, so the tag counters are released here before the rows disappear.
+    A soft-deleted post released its counters already (see blog.deletion).
+    """
+    if instance.deleted_at is not None:
+        return
+    tag_ids = Post.tags.through.objects.filter(post_id=instance.pk).values_list('tag_id', flat=True)
+    adjust_tag_counts({tag_id: -1 for tag_id in tag_ids})
+
+
+@receiver(post_delete, sender=Post)
+def release_post_category(sender, instance, **kwargs):
+    if instance.deleted_at is not None:
+        return
+    adjust_category_counts({instance.category_id: -1})
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def track_post_tags(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Keeps Tag.posts_count and the trending buckets in sync with Post.tags changes,
+    from either side of the relation (`post.tags.add(...)` or `tag.posts.add(...)`).
+    """
+    through = sender.objects
+    if action == 'pre_remove':
+        #* remove() reports the ids it was given, not the ids that were actually linked
+        lookup = {'tag_id': instance.pk, 'post_id__in': pk_set} if reverse else {'post_id': instance.pk, 'tag_id__in': pk_set}
+        instance._removed_tag_links = through.filter(**lookup).count() if reverse else list(
+            through.filter(**lookup).values_list('tag_id', flat=True)
+        )
+    elif action == 'pre_clear':
+        if reverse:
+            adjust_tag_counts({instance.pk: -through.filter(tag_id=instance.pk).count()})
+        else:
+            adjust_tag_counts({tag_id: -1 for tag_id in through.filter(post_id=instance.pk).values_list('tag_id', flat=True)})
+    elif action == 'post_remove':
+        removed = getattr(instance, '_removed_tag_links', None)
+        if reverse:
+            adjust_tag_counts({instance.pk: -(removed or 0)})
+        else:
+            adjust_tag_counts({tag_id: -1 for tag_id in removed or []})
+        instance._removed_tag_links = None
+    elif action == 'post_add' and pk_set:
+        #* pk_set only holds the links that were actually created
+        tag_counts = {instance.pk: len(pk_set)} if reverse else {tag_id: 1 for tag_id in pk_set}
+        adjust_tag_counts(tag_counts)
+        record_tag_activity(tag_counts)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(m2m_changed, sender=Post.tags.through)
+def evict_post_detail(sender, instance, **kwargs):
+    """
+    Drops the cached payload of the async post detail endpoint when the post changes.
+    """
+    if isinstance(instance, Post):
+        cache.delete(post_detail_cache_key(instance.pk))
+    else: #* tag.posts.add(...) changed the posts listed in pk_set
+        cache.delete_many([post_detail_cache_key(pk) for pk in kwargs.get('pk_set') or []])
+
+
+@receiver(post_save, sender=PostLike)
+@receiver(post_delete, sender=PostLike)
+def evict_liked_post_detail(sender, instance, **kwargs):
+    cache.delete(post_detail_cache_key(instance.post_id))
+
+
+@receiver(post_save, sender=Comment)
+def count_new_reply(sender, instance, created, raw=False, **kwargs):
+    """
+    A new reply adds one to `reply_count` of every comment above it. The ancestors are
+    decoded from the parent's path, so this is a single UPDATE.
+    """
+    if created and not raw and instance.parent_id:
+        Comment.all_objects.filter(pk__in=Comment.path_ids(instance.parent.path)).update(reply_count=F('reply_count') + 1)
+
+
+@receiver(pre_delete, sender=Comment)
+def release_deleted_reply(sender, instance, origin=None, **kwargs):
+    """
+    Every deleted reply (including the ones removed by the cascade from a deleted parent)
+    takes one off `reply_count` of each of its ancestors. Skipped when the whole post goes away,
+    and for soft-deleted comments, whose ancestors were updated when they were hidden.
+    """
+    if not instance.parent_id or instance.deleted_at is not None or isinstance(origin, Post) or getattr(origin, 'model', None) is Post:
+        return
+    Comment.all_objects.filter(pk__in=Comment.path_ids(instance.path)[:-1]).update(reply_count=F('reply_count') - 1)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def clear_slug_resolver(sender, **kwargs):
+    RESOLVERS[sender].clear()
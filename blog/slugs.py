@@ -0,0 +1,44 @@
+"""
+In-process slug -> id resolver for categories and tags.
+
+Post filters by ?category__slug= / ?tags__slug= resolve the slug here and then filter on the
+integer foreign key, so the posts query needs no join on the category or tag table. Found ids
+are kept for BLOG_SLUG_CACHE_SECONDS (misses are not cached, so rows added by bulk_create are
+found right away and the map only ever holds real slugs); the signal handlers in blog.signals
+clear a model's map whenever one of its rows is saved or deleted in this process, and the TTL
+bounds how long other processes can serve a stale mapping.
+"""
+import threading
+import time
+
+from django.conf import settings
+
+from .models import Category, Tag
+
+
+class SlugResolver:
+    def __init__(self, model):
+        self.model = model
+        self._ids = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, slug):
+        """Returns the id of the row with this slug, or None if there is none."""
+        now = time.monotonic()
+        entry = self._ids.get(slug)
+        if entry is not None and entry[1] > now:
+            return entry[0]
+        pk = self.model._default_manager.filter(slug=slug).values_list('pk', flat=True).first()
+        if pk is not None:
+            with self._lock:
+                self._ids[slug] = (pk, now + getattr(settings, 'BLOG_SLUG_CACHE_SECONDS', 300))
+        return pk
+
+    def clear(self):
+        with self._lock:
+            self._ids = {}
+
+
+category_slugs = SlugResolver(Category)
+tag_slugs = SlugResolver(Tag)
+RESOLVERS = {Category: category_slugs, Tag: tag_slugs}
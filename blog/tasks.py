@@ -0,0 +1,30 @@
+"""
+Deferred work of the blog app (see jobs.queue).
+"""
+import logging
+
+from django.conf import settings
+
+from jobs.queue import job
+from .timelines import fan_out_posts
+from .deletion import purge_deleted, schedule_purge
+
+logger = logging.getLogger(__name__)
+
+
+@job('blog.fan_out_posts', max_attempts=5)
+def fan_out_posts_job(post_ids):
+    fan_out_posts(post_ids)
+
+
+@job('blog.purge_deleted', max_attempts=5)
+def purge_deleted_job():
+    """
+    Purges soft-deleted rows, BLOG_PURGE_BATCHES_PER_JOB batches at a time. While work is left
+    the job queues itself again, so other jobs get a turn between rounds.
+    """
+    processed, finished = purge_deleted(max_batches=getattr(settings, 'BLOG_PURGE_BATCHES_PER_JOB', 20))
+    if processed:
+        logger.info('Purged %s', ', '.join(f'{rows} {stage}' for stage, rows in processed.items()))
+    if not finished:
+        schedule_purge()
@@ -1,3 +1,541 @@
-from django.test import TestCase
+import gzip
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework_simplejwt.tokens import AccessToken
+
+from blog_project.renderers import FastJSONRenderer
+from blog_project.schema import generate_schema, reset_schema_cache, write_schema_artifacts
+from profiles.models import Profile
+from .deletion import PURGE_STAGES, purge_deleted, purge_status, purge_step, soft_delete_comment, soft_delete_post, soft_delete_user
+from .exports import EXPORT_RESOURCES
+from .models import Category, Comment, Post, PostLike, Tag, TimelineEntry
+from .slugs import category_slugs, tag_slugs
+from .throttling import PostBulkThrottle, memory_buckets
+from .timelines import fan_out_posts, get_timeline, invalidate_timeline
+from .viewcounts import view_counter
+
+
+class CategoryCountTests(TestCase):
+    def setUp(self):
+        self.author = User.objects.create_user('author')
+        self.tech = Category.objects.create(name='Tech')
+        self.news = Category.objects.create(name='News')
+        self.post = Post.objects.create(author=self.author, title='Hello', content='x', category=self.tech)
+
+    def assertCounts(self, tech, news):
+        self.tech.refresh_from_db()
+        self.news.refresh_from_db()
+        self.assertEqual((self.tech.posts_count, self.news.posts_count), (tech, news))
+
+    def test_moving_a_post_moves_the_count(self):
+        post = Post.objects.get(pk=self.post.pk)
+        post.category = self.news
+        post.save()
+        self.assertCounts(0, 1)
+
+    def test_saving_with_deferred_category_keeps_counts(self):
+        post = Post.objects.only('title').get(pk=self.post.pk)
+        post.title = 'Renamed'
+        post.save()
+        self.assertCounts(1, 0)
+
+
+class ExportStreamingTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user('admin', is_staff=True)
+        self.headers = {'Authorization': f'Bearer {AccessToken.for_user(self.admin)}'}
+        Post.objects.bulk_create([Post(author=self.admin, title=f'p{i}', content='x') for i in range(5)])
+
+    def test_wsgi_export_streams_sync_rows(self):
+        response = self.client.get('/api/blog/export/posts/', headers=self.headers)
+        self.assertFalse(response.is_async)
+        self.assertEqual(len(b''.join(response.streaming_content).splitlines()), 5)
+
+    async def test_asgi_export_streams_async_rows(self):
+        response = await self.async_client.get('/api/blog/export/posts/?format=csv', headers=self.headers)
+        self.assertTrue(response.is_async) #* an ASGI server sends it chunk by chunk instead of listing it first
+        lines = b''.join([chunk async for chunk in response.streaming_content]).splitlines()
+        self.assertEqual(lines[0].decode(), ','.join(EXPORT_RESOURCES['posts'].fields))
+        self.assertEqual(len(lines), 6)
+
+
+class BulkThrottleTests(TestCase):
+    def setUp(self):
+        memory_buckets.clear()
+        self.author = User.objects.create_user('author')
+        self.headers = {'Authorization': f'Bearer {AccessToken.for_user(self.author)}'}
+
+    def bulk(self, count):
+        items = [{'title': f'p{i}', 'content': 'x'} for i in range(count)]
+        return self.client.post('/api/blog/posts/bulk/', items, content_type='application/json', headers=self.headers)
+
+    @override_settings(BLOG_BULK_BATCH_SIZE=10)
+    def test_bulk_has_its_own_rate_counted_per_batch(self):
+        with patch.object(PostBulkThrottle, 'THROTTLE_RATES', {'post_bulk': '5/hour'}):
+            self.assertEqual(self.bulk(45).status_code, 201) #* 5 batches of 10: the whole rate
+            self.assertEqual(self.bulk(1).status_code, 429)
+        self.assertEqual(Post.objects.count(), 45)
+        create = self.client.post('/api/blog/posts/', {'title': 't', 'content': 'x'}, content_type='application/json', headers=self.headers)
+        self.assertEqual(create.status_code, 201) #* post_create is untouched by the import
+
+    @override_settings(BLOG_BULK_BATCH_SIZE=10)
+    def test_bulk_that_can_never_fit_the_rate_is_a_bad_request(self):
+        with patch.object(PostBulkThrottle, 'THROTTLE_RATES', {'post_bulk': '5/hour'}):
+            response = self.bulk(51)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('post_bulk', response.data['detail'])
+
+    def test_default_rate_allows_large_imports(self):
+        for _ in range(2):
+            self.assertEqual(self.bulk(1000).status_code, 201)
+        self.assertEqual(Post.objects.count(), 2000)
+
+
+class FastJSONRendererTests(TestCase):
+    def test_line_separators_are_escaped_like_drf(self):
+        data = {'content': 'a\u2028b\u2029c \u00e9'}
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_matches_drf_on_api_payloads(self):
+        data = [{'id': 1, 'title': 'Caf\u00e9', 'category': None, 'tags': [1, 2], 'score': 0.5, 'avatar': None}]
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+
+class CompressionTests(TestCase):
+    def setUp(self):
+        author = User.objects.create_user('author')
+        self.token = str(AccessToken.for_user(author))
+        Post.objects.bulk_create([Post(author=author, title=f'post {i}', content='x' * 100) for i in range(20)])
+
+    def test_api_json_is_compressed(self):
+        response = self.client.get('/api/blog/posts/', headers={'Accept-Encoding': 'gzip', 'Authorization': f'Bearer {self.token}'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+
+    def test_html_is_not_compressed(self):
+        response = self.client.get('/admin/login/', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('Content-Encoding')) #* carries a CSRF token (BREACH)
+
+
+class ProfileStartupTests(TestCase):
+    def test_wsgi_boot_within_budget(self):
+        budget = getattr(settings, 'BLOG_STARTUP_MAX_SECONDS', 1.5)
+        out = StringIO()
+        call_command('profile_startup', target='wsgi', runs=1, max_seconds=budget, stdout=out)
+        self.assertIn('blog_project.wsgi:', out.getvalue())
+        self.assertIn(f'within the {budget:.3f}s budget', out.getvalue())
+
+    def test_boot_over_budget_fails(self):
+        with self.assertRaisesMessage(CommandError, 'over the 0.000s budget'):
+            call_command('profile_startup', target='wsgi', runs=1, max_seconds=0, stdout=StringIO())
+
+
+class SoftDeleteTests(TestCase):
+    def setUp(self):
+        self.author = User.objects.create_user('author')
+        self.reader = User.objects.create_user('reader')
+        self.post = Post.objects.create(author=self.author, title='Hello', content='x')
+        #* root > a > (a1, a2), root > b
+        self.root = self.comment(self.author)
+        self.a = self.comment(self.reader, self.root)
+        self.a1 = self.comment(self.reader, self.a)
+        self.a2 = self.comment(self.author, self.a)
+        self.b = self.comment(self.author, self.root)
+
+    def comment(self, author, parent=None):
+        return Comment.objects.create(post=self.post, author=author, parent=parent, content='c')
+
+    def reply_count(self, comment):
+        return Comment.all_objects.get(pk=comment.pk).reply_count
+
+    def test_soft_deleting_a_subtree_releases_its_replies(self):
+        self.assertEqual(self.reply_count(self.root), 4)
+        soft_delete_comment(Comment.objects.get(pk=self.a.pk))
+        self.assertEqual(self.reply_count(self.root), 1)
+        self.assertEqual(set(Comment.objects.values_list('pk', flat=True)), {self.root.pk, self.b.pk})
+        purge_deleted()
+        self.assertEqual(self.reply_count(self.root), 1) #* purging hidden rows does not count them twice
+        self.assertEqual(Comment.all_objects.count(), 2)
+
+    def test_soft_deleting_a_user_counts_nested_comments_once(self):
+        soft_delete_user(self.reader) #* wrote a and a1, which is inside a
+        self.assertEqual(self.reply_count(self.root), 1)
+        self.assertEqual(self.reply_count(self.a2), 0)
+        purge_deleted()
+        self.assertEqual(self.reply_count(self.root), 1)
+        self.assertFalse(User.objects.filter(pk=self.reader.pk).exists())
+
+    def test_purge_runs_stages_in_order_in_bounded_batches(self):
+        PostLike.objects.create(post=self.post, user=self.reader)
+        soft_delete_post(Post.objects.get(pk=self.post.pk))
+        self.assertFalse(Post.objects.exists())
+        self.assertEqual(purge_status()['comments of deleted posts'], 5)
+        order = [stage.name for stage in PURGE_STAGES]
+        steps = []
+        while (step := purge_step(batch_size=2)) is not None:
+            self.assertLessEqual(step[1], 2)
+            steps.append(step)
+        self.assertEqual([name for name, _ in steps], sorted((name for name, _ in steps), key=order.index))
+        self.assertEqual(sum(rows for name, rows in steps if name == 'comments'), 5)
+        self.assertEqual(purge_status(), {})
+        self.assertFalse(Post.all_objects.exists() or Comment.all_objects.exists() or PostLike.objects.exists())
+
+    def test_purging_a_user_removes_their_follows(self):
+        Profile.objects.get(user=self.reader).following.add(Profile.objects.get(user=self.author))
+        soft_delete_user(self.reader)
+        self.assertFalse(self.reader.is_active)
+        self.assertEqual(purge_status()['follows of deleted users'], 1)
+        processed, finished = purge_deleted()
+        self.assertTrue(finished)
+        self.assertEqual(processed['users'], 1)
+        self.assertFalse(Profile.following.through.objects.exists())
+
+
+class FeedSoftDeleteTests(TestCase):
+    def test_feed_skips_soft_deleted_posts(self):
+        author = User.objects.create_user('author')
+        reader = User.objects.create_user('reader')
+        Profile.objects.get(user=reader).following.add(Profile.objects.get(user=author))
+        posts = [Post.objects.create(author=author, title=f'p{i}', content='x') for i in range(3)]
+        headers = {'Authorization': f'Bearer {AccessToken.for_user(reader)}'}
+        self.assertEqual(self.client.get('/api/blog/feed/', headers=headers).data['count'], 3)
+        soft_delete_post(posts[1])
+        self.assertTrue(TimelineEntry.objects.filter(post=posts[1]).exists()) #* removed by the purge, not the request
+        response = self.client.get('/api/blog/feed/', headers=headers)
+        self.assertEqual(response.data['count'], 2)
+        self.assertEqual([post['id'] for post in response.data['results']], [posts[2].pk, posts[0].pk])
+
+
+class TimelineTests(TestCase):
+    def setUp(self):
+        self.author = User.objects.create_user('author')
+        self.active = User.objects.create_user('active')
+        self.inactive = User.objects.create_user('inactive')
+        author_profile = Profile.objects.get(user=self.author)
+        for user in (self.active, self.inactive):
+            Profile.objects.get(user=user).following.add(author_profile)
+        Profile.objects.filter(user=self.active).update(timeline_read_at=timezone.now())
+        self.posts = []
+        for i in range(5):
+            post = Post.objects.create(author=self.author, title=f'p{i}', content='x')
+            Post.objects.filter(pk=post.pk).update(created_at=timezone.now() - timedelta(minutes=10 - i)) #* p4 is the newest
+            self.posts.append(post)
+
+    def timeline(self, user):
+        return list(TimelineEntry.objects.filter(user=user).order_by('-created_at').values_list('post_id', flat=True))
+
+    def test_fan_out_reaches_active_followers_only(self):
+        fan_out_posts([post.pk for post in self.posts])
+        self.assertEqual(self.timeline(self.active), [post.pk for post in reversed(self.posts)])
+        self.assertEqual(self.timeline(self.inactive), [])
+
+    @override_settings(BLOG_TIMELINE_MAX_LENGTH=3, BLOG_TIMELINE_FANOUT_BATCH=2)
+    def test_fan_out_trims_timelines_past_the_cap(self):
+        for post in self.posts:
+            fan_out_posts([post.pk])
+        self.assertEqual(self.timeline(self.active), [post.pk for post in reversed(self.posts[2:])])
+
+    @override_settings(BLOG_TIMELINE_MAX_LENGTH=3)
+    def test_inactive_timeline_is_rebuilt_on_read(self):
+        self.assertEqual(list(get_timeline(self.inactive).values_list('post_id', flat=True)), [post.pk for post in reversed(self.posts[2:])])
+        self.assertIsNotNone(Profile.objects.get(user=self.inactive).timeline_read_at)
+
+    def test_invalidated_timeline_drops_unfollowed_authors(self):
+        fan_out_posts([post.pk for post in self.posts])
+        Profile.objects.get(user=self.active).following.clear()
+        invalidate_timeline(self.active)
+        self.assertFalse(get_timeline(self.active).exists())
+
+
+class AsyncReadViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user('author')
+        self.headers = {'Authorization': f'Bearer {AccessToken.for_user(self.author)}'}
+        self.posts = [Post.objects.create(author=self.author, title=f'p{i}', content='x') for i in range(8)]
+        root = Comment.objects.create(post=self.posts[0], author=self.author, content='root')
+        Comment.objects.create(post=self.posts[0], author=self.author, parent=root, content='reply')
+
+    def tearDown(self):
+        view_counter.flush() #* while the test database still exists
+
+    async def get(self, path):
+        return await self.async_client.get(path, headers=self.headers)
+
+    async def sync_get(self, path):
+        return await sync_to_async(self.client.get)(path, headers=self.headers)
+
+    async def test_list_pages_like_drf(self):
+        first = await self.get('/api/blog/async/posts/')
+        drf = (await self.sync_get('/api/blog/posts/')).json()
+        self.assertEqual((first.json()['count'], first.json()['results']), (drf['count'], drf['results']))
+        self.assertEqual(first.json()['count'], 8)
+        self.assertTrue(first.json()['next'].endswith('/api/blog/async/posts/?page=2'))
+        second = (await self.get('/api/blog/async/posts/?page=2')).json()
+        self.assertEqual(len(second['results']), 2)
+        self.assertIsNone(second['next'])
+        self.assertTrue(second['previous'].endswith('/api/blog/async/posts/'))
+        for page in ('3', '0', 'abc'):
+            response = await self.get(f'/api/blog/async/posts/?page={page}')
+            self.assertEqual((response.status_code, response.json()), (404, {'detail': 'Invalid page.'}))
+
+    async def test_detail_matches_drf_and_is_evicted_on_save(self):
+        post = self.posts[0]
+        response = await self.get(f'/api/blog/async/posts/{post.pk}/')
+        self.assertEqual(response.json(), (await self.sync_get(f'/api/blog/posts/{post.pk}/')).json())
+        post.title = 'Renamed'
+        await sync_to_async(post.save)()
+        self.assertEqual((await self.get(f'/api/blog/async/posts/{post.pk}/')).json()['title'], 'Renamed')
+        self.assertEqual((await self.get('/api/blog/async/posts/0/')).status_code, 404)
+
+    async def test_comments_match_drf(self):
+        path = f'/posts/{self.posts[0].pk}/comments/?depth=1'
+        response = await self.get('/api/blog/async' + path)
+        self.assertEqual(response.json(), (await self.sync_get('/api/blog' + path)).json())
+        self.assertEqual(len(response.json()['results'][0]['replies']), 1)
+
+    async def test_requires_authentication(self):
+        response = await self.async_client.get('/api/blog/async/posts/')
+        self.assertEqual(response.status_code, 401)
+        self.assertIn('Bearer', response['WWW-Authenticate'])
+
+
+class CachedSchemaViewTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.artifacts = tempfile.mkdtemp()
+        write_schema_artifacts(cls.artifacts)
+
+    def setUp(self):
+        reset_schema_cache()
+        self.addCleanup(reset_schema_cache)
+
+    def get(self, path='/api/schema/', **headers):
+        with override_settings(OPENAPI_SCHEMA_PRECOMPUTED=True, OPENAPI_SCHEMA_DIR=self.artifacts):
+            return self.client.get(path, headers=headers)
+
+    def test_gzip_is_negotiated(self):
+        compressed = self.get(**{'Accept-Encoding': 'br, gzip'})
+        self.assertEqual(compressed['Content-Encoding'], 'gzip')
+        plain = self.get(**{'Accept-Encoding': 'gzip;q=0, identity'})
+        self.assertFalse(plain.has_header('Content-Encoding'))
+        self.assertEqual(gzip.decompress(compressed.content), plain.content)
+        self.assertTrue(plain.content.startswith(b'openapi:'))
+        self.assertNotEqual(compressed['ETag'], plain['ETag'])
+
+    def test_etag_revalidation(self):
+        etag = self.get()['ETag']
+        self.assertEqual(self.get(**{'If-None-Match': etag}).status_code, 304)
+        self.assertEqual(self.get(**{'If-None-Match': f'W/{etag}'}).status_code, 304)
+        self.assertEqual(self.get(**{'If-None-Match': etag, 'Accept-Encoding': 'gzip'}).status_code, 200) #* other coding, other tag
+
+    def test_json_format(self):
+        for response in (self.get('/api/schema/?format=json'), self.get(Accept='application/json')):
+            self.assertEqual(response['Content-Type'], 'application/vnd.oai.openapi+json')
+            self.assertIn('jwtAuth', response.json()['components']['securitySchemes'])
+
+    def test_missing_artifacts_are_generated_once_per_process(self):
+        with override_settings(OPENAPI_SCHEMA_PRECOMPUTED=True, OPENAPI_SCHEMA_DIR=tempfile.mkdtemp()):
+            with patch('blog_project.schema.generate_schema', wraps=generate_schema) as generate:
+                first = self.client.get('/api/schema/')
+                second = self.client.get('/api/schema/?format=json')
+        self.assertEqual(generate.call_count, 1)
+        self.assertEqual((first.status_code, second.status_code), (200, 200))
+        self.assertEqual(first.content, self.get().content)
+
+
+class BulkCreateTests(TestCase):
+    def setUp(self):
+        memory_buckets.clear()
+        self.author = User.objects.create_user('author')
+        self.headers = {'Authorization': f'Bearer {AccessToken.for_user(self.author)}'}
+        self.tech = Category.objects.create(name='Tech')
+        self.django, self.python = Tag.objects.create(name='Django'), Tag.objects.create(name='Python')
+        Category.objects.bulk_create([Category(name=f'unused {i}', slug=f'unused-{i}') for i in range(5)])
+
+    def bulk(self, items):
+        return self.client.post('/api/blog/posts/bulk/', items, content_type='application/json', headers=self.headers)
+
+    def test_links_tags_and_updates_counters(self):
+        response = self.bulk([
+            {'title': 'a', 'content': 'x', 'category': self.tech.pk, 'tags': [self.django.pk, self.python.pk]},
+            {'title': 'b', 'content': 'x', 'tags': [self.django.pk, self.django.pk]},
+        ])
+        self.assertEqual((response.status_code, response.data['created']), (201, 2))
+        a, b = Post.objects.filter(pk__in=response.data['ids']).order_by('title')
+        self.assertEqual((a.author, a.category), (self.author, self.tech))
+        self.assertEqual(set(a.tags.all()), {self.django, self.python})
+        self.assertEqual(list(b.tags.all()), [self.django])
+        self.tech.refresh_from_db()
+        self.django.refresh_from_db()
+        self.python.refresh_from_db()
+        self.assertEqual((self.tech.posts_count, self.django.posts_count, self.python.posts_count), (1, 2, 1))
+
+    def test_invalid_items_are_reported_by_index(self):
+        response = self.bulk([
+            {'title': 'ok', 'content': 'x'},
+            {'title': 'bad category', 'content': 'x', 'category': 999},
+            {'title': 'bad tag', 'content': 'x', 'tags': ['abc']},
+            {'content': 'no title'},
+            {'title': 'huge id', 'content': 'x', 'category': 10 ** 400},
+        ])
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual(response.data['created'], 1)
+        self.assertEqual([error['index'] for error in response.data['errors']], [1, 2, 3, 4])
+        self.assertIn('category', response.data['errors'][0]['errors'])
+        self.assertIn('tags', response.data['errors'][1]['errors'])
+        self.assertEqual(self.bulk([{'content': 'no title'}]).status_code, 400)
+
+    def test_only_referenced_categories_and_tags_are_loaded(self):
+        items = [{'title': f'p{i}', 'content': 'x', 'category': self.tech.pk, 'tags': [self.django.pk]} for i in range(20)]
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.bulk(items).status_code, 201)
+        lookups = [query['sql'] for query in queries.captured_queries if query['sql'].startswith('SELECT') and ('"blog_category"' in query['sql'] or '"blog_tag"' in query['sql'])]
+        self.assertEqual(len(lookups), 2)
+        self.assertTrue(all(' IN (' in sql for sql in lookups))
+
+
+class CommentThreadTests(TestCase):
+    def setUp(self):
+        memory_buckets.clear()
+        self.author = User.objects.create_user('author')
+        self.headers = {'Authorization': f'Bearer {AccessToken.for_user(self.author)}'}
+        self.post = Post.objects.create(author=self.author, title='Hello', content='x')
+        #* root > a > a1, root > b, and an older top-level comment
+        self.older = self.comment()
+        self.root = self.comment()
+        self.a = self.comment(self.root)
+        self.a1 = self.comment(self.a)
+        self.b = self.comment(self.root)
+
+    def comment(self, parent=None, post=None):
+        return Comment.objects.create(post=post or self.post, author=self.author, parent=parent, content='c')
+
+    def reply_counts(self):
+        return dict(Comment.all_objects.values_list('pk', 'reply_count'))
+
+    def thread(self, query=''):
+        return self.client.get(f'/api/blog/posts/{self.post.pk}/comments/{query}', headers=self.headers)
+
+    def test_path_encoding(self):
+        self.assertEqual(Comment.path_segment(1), '0000001')
+        self.assertEqual(Comment.path_segment(36 ** 2 + 35), '000010z')
+        self.assertEqual(Comment.path_ids(Comment.path_segment(5) + Comment.path_segment(36 ** 6)), [5, 36 ** 6])
+        a1 = Comment.objects.get(pk=self.a1.pk)
+        self.assertEqual(a1.path, self.root.path + Comment.path_segment(self.a.pk) + Comment.path_segment(a1.pk))
+        self.assertEqual((a1.depth, Comment.path_ids(a1.path)), (2, [self.root.pk, self.a.pk, a1.pk]))
+
+    def test_reply_count_on_create(self):
+        counts = self.reply_counts()
+        self.assertEqual((counts[self.root.pk], counts[self.a.pk], counts[self.a1.pk], counts[self.older.pk]), (3, 1, 0, 0))
+
+    def test_hard_delete_releases_the_cascade(self):
+        Comment.all_objects.get(pk=self.a.pk).delete() #* takes a1 with it
+        self.assertEqual(self.reply_counts(), {self.older.pk: 0, self.root.pk: 1, self.b.pk: 0})
+        Comment.all_objects.get(pk=self.root.pk).delete()
+        self.assertEqual(self.reply_counts(), {self.older.pk: 0})
+
+    def test_deleting_the_post_skips_reply_counters(self):
+        with CaptureQueriesContext(connection) as queries:
+            Post.all_objects.get(pk=self.post.pk).delete()
+        self.assertFalse(Comment.all_objects.exists())
+        self.assertFalse([query for query in queries.captured_queries if query['sql'].startswith('UPDATE "blog_comment"')])
+
+    def test_thread_nesting_and_depth(self):
+        results = self.thread().data['results']
+        self.assertEqual([comment['id'] for comment in results], [self.root.pk, self.older.pk]) #* newest first
+        self.assertEqual([reply['id'] for reply in results[0]['replies']], [self.a.pk, self.b.pk])
+        self.assertEqual([reply['id'] for reply in results[0]['replies'][0]['replies']], [self.a1.pk])
+        shallow = self.thread('?depth=1').data['results'][0]
+        self.assertEqual([reply['replies'] for reply in shallow['replies']], [[], []])
+        self.assertEqual(self.thread('?depth=0').data['results'][0]['replies'], [])
+        for query in ('?depth=x', f'?depth={Comment.MAX_DEPTH + 1}', '?depth=-1'):
+            self.assertEqual(self.thread(query).status_code, 400)
+
+    def test_thread_parameter_loads_one_subtree(self):
+        [only] = self.thread(f'?thread={self.a.pk}').data['results']
+        self.assertEqual((only['id'], [reply['id'] for reply in only['replies']]), (self.a.pk, [self.a1.pk]))
+        self.assertEqual(self.thread('?thread=abc').status_code, 400)
+
+    def reply(self, parent, post=None):
+        return self.client.post(
+            f'/api/blog/posts/{(post or self.post).pk}/comments/', {'content': 'r', 'parent': parent.pk},
+            content_type='application/json', headers=self.headers,
+        )
+
+    @override_settings(BLOG_COMMENT_MAX_DEPTH=2)
+    def test_reply_validation(self):
+        self.assertEqual(self.reply(self.a).status_code, 201) #* depth 2
+        response = self.reply(self.a1)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('at most 2 levels', str(response.data['parent']))
+        other = Post.objects.create(author=self.author, title='Other', content='x')
+        self.assertEqual(self.reply(self.a, post=other).status_code, 400)
+        moved = self.client.patch(f'/api/blog/comments/{self.a1.pk}/', {'parent': self.b.pk}, content_type='application/json', headers=self.headers)
+        self.assertEqual(moved.status_code, 400)
+
+
+class SlugTests(TestCase):
+    def setUp(self):
+        category_slugs.clear()
+        tag_slugs.clear()
+        self.author = User.objects.create_user('author')
+        self.headers = {'Authorization': f'Bearer {AccessToken.for_user(self.author)}'}
+
+    def test_save_picks_the_next_free_suffix(self):
+        self.assertEqual(Category.objects.create(name='Tech').slug, 'tech')
+        self.assertEqual(Category.objects.create(name='Tech!').slug, 'tech-2')
+        self.assertEqual(Category.objects.create(name='Tech?').slug, 'tech-3')
+        self.assertEqual(Category.objects.create(name='!!!').slug, 'category') #* nothing left to slugify
+        self.assertEqual(len(Category.objects.create(name='x' * 100).slug), 94) #* room for a suffix
+
+    def test_bulk_create_suffixes_collisions_within_the_batch(self):
+        Tag.objects.create(name='Web Dev')
+        Tag.objects.create(name='Web Dev 3', slug='web-dev-3')
+        tags = Tag.objects.bulk_create([Tag(name='web dev!'), Tag(name='WEB DEV?'), Tag(name='Custom', slug='mine'), Tag(name='Other')])
+        self.assertEqual([tag.slug for tag in tags], ['web-dev-2', 'web-dev-4', 'mine', 'other'])
+        self.assertEqual(Tag.objects.filter(slug__startswith='web-dev').count(), 4)
+
+    def test_resolver_is_cleared_on_save_and_delete(self):
+        tech = Category.objects.create(name='Tech')
+        self.assertEqual(category_slugs.resolve('tech'), tech.pk)
+        tech.slug = 'technology'
+        tech.save()
+        self.assertIsNone(category_slugs.resolve('tech'))
+        self.assertEqual(category_slugs.resolve('technology'), tech.pk)
+        tech.delete()
+        self.assertIsNone(category_slugs.resolve('technology'))
+
+    def test_misses_are_not_cached(self):
+        self.assertIsNone(tag_slugs.resolve('django'))
+        Tag.objects.bulk_create([Tag(name='Django')]) #* no post_save signal
+        self.assertIsNotNone(tag_slugs.resolve('django'))
+
+    def test_slug_routes_and_filters(self):
+        tech, django = Category.objects.create(name='Tech'), Tag.objects.create(name='Django')
+        tagged = Post.objects.create(author=self.author, title='Tagged', content='x', category=tech)
+        tagged.tags.add(django)
+        Post.objects.create(author=self.author, title='Plain', content='x')
+        for path, pk in (('/api/blog/categories/slug/tech/', tech.pk), ('/api/blog/tags/slug/django/', django.pk)):
+            response = self.client.get(path, headers=self.headers)
+            self.assertEqual((response.status_code, response.data['id']), (200, pk))
+        self.assertEqual(self.client.get('/api/blog/tags/slug/missing/', headers=self.headers).status_code, 404)
+        for query in ('category__slug=tech', 'tags__slug=django'):
+            response = self.client.get(f'/api/blog/posts/?{query}', headers=self.headers)
+            self.assertEqual([post['id'] for post in response.data['results']], [tagged.pk])
+        self.assertEqual(self.client.get('/api/blog/posts/?tags__slug=missing', headers=self.headers).data['count'], 0)
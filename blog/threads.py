@@ -0,0 +1,77 @@
+"""
+Loading comment threads (see Comment for the materialized-path encoding).
+
+A page of top-level comments is loaded first; all of their replies, optionally limited to
+`depth` levels, then come from one query of index range scans on (post, path), already in
+thread order. `nest_comments` turns that flat, path-ordered list into nested `replies`.
+"""
+from functools import reduce
+from operator import or_
+
+from django.db.models import Count, Q
+from rest_framework.exceptions import ValidationError
+
+from .models import Comment
+
+
+def parse_reply_depth(value):
+    """
+    Parses ?depth= (reply levels to include below each top-level comment; omitted = all).
+    """
+    if value is None:
+        return None
+    try:
+        depth = int(value)
+    except (TypeError, ValueError):
+        raise ValidationError({'depth': 'A valid integer is required.'})
+    if not 0 <= depth <= Comment.MAX_DEPTH:
+        raise ValidationError({'depth': f'Must be between 0 and {Comment.MAX_DEPTH}.'})
+    return depth
+
+
+def root_comments(post_id, thread=None):
+    """
+    Top-level comments of a post, newest first, or only the comment `thread` (any level).
+    """
+    if thread is not None:
+        try:
+            return Comment.objects.filter(post_id=post_id, pk=int(thread)).order_by('path')
+        except (TypeError, ValueError):
+            raise ValidationError({'thread': 'A valid comment id is required.'})
+    return Comment.objects.filter(post_id=post_id, depth=0).order_by('-path') #* top-level paths encode the id: newest first
+
+
+def subtree_queryset(post_id, roots, depth=None):
+    """
+    The given comments and their replies (down to `depth` levels below each), in thread order.
+    """
+    if not roots:
+        return Comment.objects.none()
+    ranges = []
+    for root in roots:
+        condition = Q(path__gte=root.path, path__lt=root.path + '~') #* '~' sorts after every base36 digit
+        if depth is not None:
+            condition &= Q(depth__lte=root.depth + depth)
+        ranges.append(condition)
+    return (
+        Comment.objects.filter(reduce(or_, ranges), post_id=post_id)
+        .select_related('author')
+        .annotate(likes_total=Count('likes'))
+        .order_by('path')
+    )
+
+
+def nest_comments(roots, serialized):
+    """
+    Nests serialized comments (in path order) under their parents and returns the
+    serialized `roots` in their original order, each with a `replies` list.
+    """
+    root_ids = {root.pk for root in roots}
+    by_id = {}
+    for item in serialized:
+        item['replies'] = []
+        by_id[item['id']] = item
+        parent = by_id.get(item['parent'])
+        if parent is not None and item['id'] not in root_ids: #* parents always come first in path order
+            parent['replies'].append(item)
+    return [by_id[root.pk] for root in roots if root.pk in by_id]
@@ -0,0 +1,147 @@
+"""
+Write throttles for likes, comments and post creation.
+
+The rates come from REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'] like DRF's own throttles, but each
+check is O(1): instead of the per-client list of request timestamps that SimpleRateThrottle
+reads and rewrites on every request, each client has either
+
+- a token bucket in process memory (BLOG_THROTTLE_STORE = 'memory', the default), refilled
+  continuously at `rate` and allowing bursts up to the full rate, or
+- a fixed-window counter in a shared cache (BLOG_THROTTLE_STORE = 'cache'), updated with one
+  atomic `incr`, for deployments where several processes must share the limit.
+"""
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.exceptions import ValidationError
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class MemoryTokenBuckets:
+    """
+    Per-process token buckets. Buckets that have refilled completely carry no state and are
+    dropped periodically, so memory is bounded by the number of recently active clients.
+    """
+    prune_every = 4096
+
+    def __init__(self):
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self._checks = 0
+
+    def consume(self, key, capacity, duration, now, cost=1):
+        """Takes `cost` tokens. Returns (allowed, seconds until that many tokens are available)."""
+        refill_rate = capacity / duration
+        with self._lock:
+            tokens, last = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - last) * refill_rate)
+            allowed = tokens >= cost
+            self._buckets[key] = (tokens - cost if allowed else tokens, now)
+            self._checks += 1
+            if self._checks >= self.prune_every:
+                self._prune(now, duration)
+        return allowed, 0 if allowed else (cost - tokens) / refill_rate
+
+    def _prune(self, now, duration):
+        self._checks = 0
+        self._buckets = {key: value for key, value in self._buckets.items() if now - value[1] < duration}
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class CacheWindowCounters:
+    """
+    Fixed-window counters in a Django cache shared by all processes. The hot path is a single
+    atomic `incr`; the counter is created with `add` only on the first request of a window.
+    A rejected request gives its `cost` back, so a refused bulk request does not use up the window.
+    """
+    def consume(self, key, capacity, duration, now, cost=1):
+        cache = caches[getattr(settings, 'BLOG_THROTTLE_CACHE_ALIAS', 'default')]
+        window = int(now // duration)
+        window_key = f'{key}:{window}'
+        try:
+            count = cache.incr(window_key, cost)
+        except ValueError: #* first request of the window
+            if cache.add(window_key, cost, duration + 1):
+                count = cost
+            else:
+                count = cache.incr(window_key, cost)
+        if count > capacity:
+            cache.decr(window_key, cost)
+            return False, (window + 1) * duration - now
+        return True, 0
+
+
+memory_buckets = MemoryTokenBuckets()
+cache_counters = CacheWindowCounters()
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """
+    Per-user throttle (per-IP for anonymous requests) for the rate of `scope`.
+    Set `methods` to only count some HTTP methods, e.g. the POST half of a GET/POST action.
+    `get_cost` is the number of tokens a request takes (one by default); a request that costs
+    more than the whole rate could never be let through, so it is refused with a 400, not a 429.
+    """
+    methods = None
+
+    def get_cost(self, request, view):
+        return 1
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            ident = request.user.pk
+        else:
+            ident = self.get_ident(request)
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
+
+    def allow_request(self, request, view):
+        if self.rate is None or (self.methods is not None and request.method not in self.methods):
+            return True
+        key = self.get_cache_key(request, view)
+        if key is None:
+            return True
+        cost = self.get_cost(request, view)
+        if cost > self.num_requests:
+            raise ValidationError({'detail': (
+                f'This request counts as {cost} against the {self.scope} rate, '
+                f'which allows {self.num_requests} per {self.duration}s. Split it into smaller requests.'
+            )})
+        store = cache_counters if getattr(settings, 'BLOG_THROTTLE_STORE', 'memory') == 'cache' else memory_buckets
+        allowed, self._wait = store.consume(key, self.num_requests, self.duration, time.time(), cost)
+        return allowed
+
+    def wait(self):
+        return getattr(self, '_wait', None)
+
+
+class LikeThrottle(TokenBucketThrottle):
+    scope = 'like'
+
+
+class CommentCreateThrottle(TokenBucketThrottle):
+    scope = 'comment'
+    methods = ['POST']
+
+
+class PostCreateThrottle(TokenBucketThrottle):
+    scope = 'post_create'
+    methods = ['POST']
+
+
+class PostBulkThrottle(TokenBucketThrottle):
+    """
+    POST /posts/bulk/ takes one token per BLOG_BULK_BATCH_SIZE posts (one INSERT batch),
+    so imports are limited by the rows written rather than by the number of requests.
+    """
+    scope = 'post_bulk'
+
+    def get_cost(self, request, view):
+        if not isinstance(request.data, list):
+            return 1
+        return max(math.ceil(len(request.data) / getattr(settings, 'BLOG_BULK_BATCH_SIZE', 500)), 1)
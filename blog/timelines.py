@@ -0,0 +1,140 @@
+"""
+Materialized home timelines ("following" feed) with fan-out on write.
+
+When a post is created it is copied into the timeline of every *active* follower of its
+author (someone who read their timeline in the last BLOG_TIMELINE_ACTIVE_DAYS). The copy is a
+background job (`blog.fan_out_posts`, see jobs.queue) that runs after the transaction commits,
+in batches of BLOG_TIMELINE_FANOUT_BATCH followers per INSERT, so creating a post does not wait
+for the fan-out.
+
+Timelines of inactive users are not written to; they are rebuilt from the followed authors'
+latest posts on the next read. Every timeline is capped at BLOG_TIMELINE_MAX_LENGTH entries:
+the fan-out trims the timelines it pushes past the cap, and reads trim at most once an hour.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from jobs.queue import enqueue
+from profiles.models import Profile
+from .models import Post, TimelineEntry
+
+
+def timeline_max_length():
+    return getattr(settings, 'BLOG_TIMELINE_MAX_LENGTH', 500)
+
+
+def active_cutoff():
+    return timezone.now() - timedelta(days=getattr(settings, 'BLOG_TIMELINE_ACTIVE_DAYS', 14))
+
+
+def _fanout_batch_size():
+    return getattr(settings, 'BLOG_TIMELINE_FANOUT_BATCH', 1000)
+
+
+def fan_out_posts(post_ids):
+    """
+    Inserts the given posts into the timelines of their authors' active followers.
+    Followers are streamed in batches; each batch is one bulk INSERT, after which the
+    timelines it pushed past BLOG_TIMELINE_MAX_LENGTH are trimmed.
+    """
+    posts_by_author = defaultdict(list)
+    for pk, author_id, created_at in Post.objects.filter(pk__in=post_ids).values_list('pk', 'author_id', 'created_at'):
+        posts_by_author[author_id].append((pk, created_at))
+
+    batch_size = _fanout_batch_size()
+    cutoff = active_cutoff()
+    for author_id, posts in posts_by_author.items():
+        followers = Profile.objects.filter(
+            following__user_id=author_id, timeline_read_at__gte=cutoff,
+        ).values_list('user_id', flat=True).iterator(chunk_size=batch_size)
+        batch, batch_users = [], []
+        for user_id in followers:
+            batch.extend(TimelineEntry(user_id=user_id, post_id=pk, created_at=created_at) for pk, created_at in posts)
+            batch_users.append(user_id)
+            if len(batch) >= batch_size:
+                _insert_entries(batch, batch_users, batch_size)
+                batch, batch_users = [], []
+        if batch:
+            _insert_entries(batch, batch_users, batch_size)
+
+
+def _insert_entries(entries, user_ids, batch_size):
+    TimelineEntry.objects.bulk_create(entries, batch_size=batch_size, ignore_conflicts=True)
+    trim_timelines(user_ids)
+
+
+def schedule_fan_out(post_ids):
+    """
+    Queues the fan-out of the given posts; it runs once the current transaction commits.
+    """
+    post_ids = list(post_ids)
+    if post_ids:
+        enqueue('blog.fan_out_posts', args=[post_ids], dedup_key=f'fan-out:{post_ids[0]}' if len(post_ids) == 1 else None)
+
+
+def rebuild_timeline(user):
+    """
+    Rebuilds `user`'s timeline from the latest posts of the people they follow,
+    using one indexed query on Post(author, created_at).
+    """
+    followed = Profile.objects.filter(followers__user=user).values('user_id')
+    latest = Post.objects.filter(author_id__in=followed).order_by('-created_at').values_list('pk', 'created_at')
+    with transaction.atomic():
+        TimelineEntry.objects.filter(user=user).delete()
+        TimelineEntry.objects.bulk_create(
+            [TimelineEntry(user=user, post_id=pk, created_at=created_at) for pk, created_at in latest[:timeline_max_length()]],
+            batch_size=_fanout_batch_size(),
+            ignore_conflicts=True,
+        )
+        Profile.objects.filter(user=user).update(timeline_read_at=timezone.now())
+
+
+def trim_timelines(user_ids):
+    """
+    Trims the timelines of `user_ids` that hold more than BLOG_TIMELINE_MAX_LENGTH entries,
+    found with one grouped count over the (user, created_at) index.
+    """
+    over = (
+        TimelineEntry.objects.filter(user_id__in=user_ids).values('user_id')
+        .annotate(n=Count('pk')).filter(n__gt=timeline_max_length()).values_list('user_id', flat=True)
+    )
+    for user_id in over:
+        trim_timeline(user_id)
+
+
+def trim_timeline(user):
+    """
+    Drops the entries beyond the newest BLOG_TIMELINE_MAX_LENGTH (`user` is a User or its id).
+    """
+    entries = TimelineEntry.objects.filter(user=user).order_by('-created_at')
+    cutoff = entries.values_list('created_at', flat=True)[timeline_max_length():timeline_max_length() + 1].first()
+    if cutoff is not None:
+        entries.filter(created_at__lte=cutoff).delete()
+
+
+def invalidate_timeline(user):
+    """
+    Marks the timeline stale (e.g. after a follow/unfollow) so the next read rebuilds it.
+    """
+    Profile.objects.filter(user=user).update(timeline_read_at=None)
+
+
+def get_timeline(user):
+    """
+    Returns the TimelineEntry queryset of `user`, newest first, rebuilding it first if the
+    user was inactive. For active users the read marker is refreshed (and the timeline trimmed)
+    at most once an hour, so reads stay write-free. Entries of soft-deleted posts are left out;
+    the purge removes them later (see blog.deletion).
+    """
+    read_at = Profile.objects.filter(user=user).values_list('timeline_read_at', flat=True).first()
+    if read_at is None or read_at < active_cutoff():
+        rebuild_timeline(user)
+    elif read_at < timezone.now() - timedelta(hours=1):
+        Profile.objects.filter(user=user).update(timeline_read_at=timezone.now())
+        trim_timeline(user)
+    return TimelineEntry.objects.filter(user=user, post__deleted_at__isnull=True).order_by('-created_at')
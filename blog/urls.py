@@ -1,39 +1,59 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import CategoryViewSet, TagViewSet, PostViewSet, CommentViewSet
+from .views import CategoryViewSet, TagViewSet, PostViewSet, CommentViewSet, FeedViewSet, ExportView
+from .async_views import AsyncPostListView, AsyncPostDetailView, AsyncPostCommentsView
 
 router = DefaultRouter()
 router.register(r'categories', CategoryViewSet, basename='category')
 router.register(r'tags', TagViewSet, basename='tag')
 router.register(r'posts', PostViewSet, basename='post')
 router.register(r'comments', CommentViewSet, basename='comment')
+router.register(r'feed', FeedViewSet, basename='feed')
 
 urlpatterns = [
 	path('', include(router.urls)),
+	path('export/<str:resource>/', ExportView.as_view(), name='export'),
+	# ASGI-native read path
+	path('async/posts/', AsyncPostListView.as_view(), name='post-list-async'),
+	path('async/posts/<int:pk>/', AsyncPostDetailView.as_view(), name='post-detail-async'),
+	path('async/posts/<int:pk>/comments/', AsyncPostCommentsView.as_view(), name='post-comments-async'),
 ]
 
 # Available routes:
 # Categories (read-only)
 #   GET /categories/ - List categories
 #   GET /categories/{id}/ - Retrieve category
+#   GET /categories/slug/{slug}/ - Retrieve category by slug
 # Tags (read-only)
 #   GET /tags/ - List tags
 #   GET /tags/{id}/ - Retrieve tag
+#   GET /tags/slug/{slug}/ - Retrieve tag by slug
+#   GET /tags/trending/ - Tags ranked by recent activity (?hours=24&limit=10)
 # Posts
 #   GET /posts/ - List posts (supports filter, search, ordering)
 #   POST /posts/ - Create post (auth)
+#   POST /posts/bulk/ - Create many posts from a JSON array or NDJSON body (auth)
 #   GET /posts/{id}/ - Retrieve post
 #   PUT /posts/{id}/ - Update post (author only)
 #   PATCH /posts/{id}/ - Partial update post (author only)
 #   DELETE /posts/{id}/ - Delete post (author only)
 #   POST /posts/{id}/like/ - Toggle like on post
-#   GET /posts/{id}/comments/ - List comments for post
-#   POST /posts/{id}/comments/ - Add comment to post
+#   GET /posts/{id}/comments/ - Top-level comments with nested replies (?page=N, ?depth=N, ?thread=<comment id>)
+#   POST /posts/{id}/comments/ - Add comment to post ("parent": <comment id> to reply)
 # Comments
 #   GET /comments/ - List comments
-#   POST /comments/ - Create comment
+#   POST /comments/ - Create comment, or a reply with "parent": <comment id>
 #   GET /comments/{id}/ - Retrieve comment
 #   PUT /comments/{id}/ - Update comment (author only)
 #   PATCH /comments/{id}/ - Partial update comment (author only)
 #   DELETE /comments/{id}/ - Delete comment (author only)
-#   POST /comments/{id}/like/ - Toggle like on comment
\ No newline at end of file
+#   POST /comments/{id}/like/ - Toggle like on comment
+# Feed
+#   GET /feed/ - Home timeline: posts from the people you follow, newest first
+# Async read path (same payloads, served on the event loop under ASGI)
+#   GET /async/posts/ - List posts (newest first, ?page=N)
+#   GET /async/posts/{id}/ - Retrieve post
+#   GET /async/posts/{id}/comments/ - Top-level comments with nested replies (?page=N, ?depth=N, ?thread=<comment id>)
+# Export (admin only)
+#   GET /export/{resource}/ - Stream posts, post_tags, comments, post_likes, comment_likes or profiles
+#                             as NDJSON (default) or CSV (?format=csv), optionally ?since=<ISO datetime>
\ No newline at end of file
@@ -0,0 +1,119 @@
+"""
+Buffered post view counting.
+
+Reading a post never writes to the database: `record_view` only checks the per-viewer dedup
+key in the cache (one view per user, or IP for anonymous readers, per post every
+BLOG_VIEWS_DEDUP_SECONDS) and bumps an in-memory counter. Counters are sharded by post id,
+each shard with its own lock, so concurrent requests rarely wait on each other.
+
+A daemon thread flushes the buffered counts every BLOG_VIEWS_FLUSH_SECONDS with
+`adjust_view_counts`, i.e. one `UPDATE ... SET views_count = views_count + n` per distinct n,
+and once more when the process exits. Counts buffered by a process that is killed are lost,
+which is acceptable for a popularity metric.
+"""
+import atexit
+import logging
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections
+
+from .counters import adjust_view_counts
+
+logger = logging.getLogger(__name__)
+
+
+def _views_setting(name, default):
+    return getattr(settings, f'BLOG_VIEWS_{name}', default)
+
+
+def viewer_key(user, meta):
+    if user is not None and user.is_authenticated:
+        return f'u{user.pk}'
+    return f'ip{meta.get("REMOTE_ADDR", "")}'
+
+
+def view_dedup_key(post_id, viewer):
+    return f'blog:post-view:{post_id}:{viewer}'
+
+
+class ViewCounter:
+    """
+    Per-process buffer of {post_id: views} split into shards, flushed by a background thread.
+    """
+    def __init__(self, shards=16):
+        self._shards = [(Counter(), threading.Lock()) for _ in range(shards)]
+        self._flusher = None
+        self._flusher_lock = threading.Lock()
+        self._stopping = threading.Event()
+
+    def add(self, post_id, n=1):
+        counts, lock = self._shards[hash(post_id) % len(self._shards)]
+        with lock:
+            counts[post_id] += n
+        if self._flusher is None:
+            self._start_flusher()
+
+    def _drain(self):
+        total = Counter()
+        for counts, lock in self._shards:
+            with lock:
+                total.update(counts)
+                counts.clear()
+        return total
+
+    def flush(self):
+        """Writes the buffered counts to Post.views_count and returns how many views were written."""
+        deltas = self._drain()
+        if not deltas:
+            return 0
+        try:
+            adjust_view_counts(deltas)
+        except Exception:
+            for post_id, n in deltas.items(): #* keep them for the next flush
+                self.add(post_id, n)
+            raise
+        return sum(deltas.values())
+
+    def _start_flusher(self):
+        with self._flusher_lock:
+            if self._flusher is not None:
+                return
+            self._flusher = threading.Thread(target=self._run_flusher, name='blog-view-counts', daemon=True)
+            self._flusher.start()
+            atexit.register(self.stop)
+
+    def _run_flusher(self):
+        while not self._stopping.wait(_views_setting('FLUSH_SECONDS', 10)):
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Flushing post view counts failed; retrying on the next tick.')
+            finally:
+                close_old_connections()
+
+    def stop(self):
+        """Stops the flusher and writes what is left."""
+        self._stopping.set()
+        try:
+            self.flush()
+        except Exception:
+            logger.exception('Flushing post view counts at shutdown failed.')
+
+
+view_counter = ViewCounter(shards=_views_setting('SHARDS', 16))
+
+
+def record_view(post_id, user, meta):
+    """
+    Counts one view of `post_id` unless this viewer was already counted in the current window.
+    """
+    if cache.add(view_dedup_key(post_id, viewer_key(user, meta)), 1, _views_setting('DEDUP_SECONDS', 1800)):
+        view_counter.add(post_id)
+
+
+async def arecord_view(post_id, user, meta):
+    if await cache.aadd(view_dedup_key(post_id, viewer_key(user, meta)), 1, _views_setting('DEDUP_SECONDS', 1800)):
+        view_counter.add(post_id)
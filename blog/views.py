@@ -1,59 +1,147 @@
+from datetime import datetime, time
 from rest_framework import viewsets, permissions, status
 from rest_framework.response import Response
+from rest_framework.views import APIView
 from rest_framework.filters import SearchFilter, OrderingFilter
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError, NotFound
+from rest_framework.parsers import JSONParser
 from django_filters.rest_framework import DjangoFilterBackend
 from django.shortcuts import get_object_or_404
+from django.conf import settings
+from django.db.models import Count
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 from .models import Category, Tag, Post, Comment, PostLike, CommentLike
-from .serializers import CategorySerializer, TagSerializer, PostSerializer, CommentSerializer
+from .timelines import get_timeline
+from .viewcounts import record_view
+from .slugs import category_slugs, tag_slugs
+from .filters import PostFilter
+from .threads import parse_reply_depth, root_comments, subtree_queryset, nest_comments
+from .serializers import (
+    CategorySerializer, TagSerializer, TrendingTagSerializer, PostSerializer, PostBulkSerializer,
+    PostBulkResultSerializer, CommentSerializer, CommentThreadSerializer,
+)
 from .permissions import IsAuthorOrReadOnly
-from drf_spectacular.utils import extend_schema, extend_schema_view
+from .parsers import NDJSONParser
+from .renderers import NDJSONRenderer, CSVRenderer
+from .exports import EXPORT_RESOURCES, export_rows, aexport_rows
+from .counters import trending_tag_scores
+from .bulk import bulk_create_posts
+from .deletion import soft_delete_post, soft_delete_comment
+from .throttling import LikeThrottle, CommentCreateThrottle, PostCreateThrottle, PostBulkThrottle
+from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiParameter
+from drf_spectacular.types import OpenApiTypes
+
+class SlugRetrieveMixin:
+    """
+    Adds GET {prefix}/slug/{slug}/ to a read-only viewset, resolving the slug with `slug_resolver`.
+    """
+    slug_resolver = None
+
+    @action(detail=False, methods=['get'], url_path=r'slug/(?P<slug>[-\w]+)')
+    def by_slug(self, request, slug=None):
+        pk = self.slug_resolver.resolve(slug) # type: ignore
+        if pk is None:
+            raise NotFound(f'No {self.queryset.model._meta.verbose_name} matches the given slug.') # type: ignore
+        instance = get_object_or_404(self.get_queryset(), pk=pk) # type: ignore
+        return Response(self.get_serializer(instance).data) # type: ignore
 
 @extend_schema_view(
     list=extend_schema(
         tags=['Categories'],
         summary='List categories',
-        description='Get all content categories available for posts. Authentication required.'
+        description='Get all content categories available for posts, with their post counts. Authentication required. Supports ?ordering=-posts_count'
     ),
     retrieve=extend_schema(
         tags=['Categories'],
         summary='Get category details',
         description='Retrieve a single category by ID.'
+    ),
+    by_slug=extend_schema(
+        tags=['Categories'],
+        summary='Get category by slug',
+        description='Retrieve a single category by its slug, e.g. /categories/slug/tech/.'
     )
 )
-class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
+class CategoryViewSet(SlugRetrieveMixin, viewsets.ReadOnlyModelViewSet):
     """
     A viewset for viewing categories.
     """
     queryset = Category.objects.all().order_by('name')
     serializer_class = CategorySerializer
     permission_classes = [permissions.IsAuthenticated]
+    ordering_fields = ['name', 'posts_count']
+    slug_resolver = category_slugs
 
 @extend_schema_view(
     list=extend_schema(
         tags=['Tags'],
         summary='List tags',
-        description='Get all content tags available for posts. Authentication required.'
+        description='Get all content tags available for posts, with their post counts. Authentication required. Supports ?ordering=-posts_count'
     ),
     retrieve=extend_schema(
         tags=['Tags'],
         summary='Get tag details',
         description='Retrieve a single tag by ID.'
+    ),
+    by_slug=extend_schema(
+        tags=['Tags'],
+        summary='Get tag by slug',
+        description='Retrieve a single tag by its slug, e.g. /tags/slug/django/.'
+    ),
+    trending=extend_schema(
+        tags=['Tags'],
+        summary='Trending tags',
+        description='Tags ranked by how often they were attached to posts recently. Query params: ?hours=24&limit=10',
+        parameters=[
+            OpenApiParameter('hours', int, description='Size of the window in hours (1-168, default 24).'),
+            OpenApiParameter('limit', int, description='Number of tags to return (1-50, default 10).'),
+        ],
+        responses=TrendingTagSerializer(many=True)
     )
 )
-class TagViewSet(viewsets.ReadOnlyModelViewSet):
+class TagViewSet(SlugRetrieveMixin, viewsets.ReadOnlyModelViewSet):
     """
     A viewset for viewing tags.
     """
     queryset = Tag.objects.all().order_by('name')
     serializer_class = TagSerializer
     permission_classes = [permissions.IsAuthenticated]
+    ordering_fields = ['name', 'posts_count']
+    slug_resolver = tag_slugs
+
+    @staticmethod
+    def _bounded_int(request, name, default, maximum):
+        value = request.query_params.get(name, default)
+        try:
+            value = int(value)
+        except (TypeError, ValueError):
+            raise ValidationError({name: 'A valid integer is required.'})
+        if not 1 <= value <= maximum:
+            raise ValidationError({name: f'Must be between 1 and {maximum}.'})
+        return value
+
+    @action(detail=False, methods=['get'], pagination_class=None)
+    def trending(self, request):
+        hours = self._bounded_int(request, 'hours', 24, 24 * 7)
+        limit = self._bounded_int(request, 'limit', 10, 50)
+        scores = trending_tag_scores(hours=hours, limit=limit)
+        tags = Tag.objects.in_bulk([tag_id for tag_id, _ in scores])
+        ranked = []
+        for tag_id, score in scores:
+            if tag_id in tags:
+                tags[tag_id].score = score # type: ignore
+                ranked.append(tags[tag_id])
+        return Response(TrendingTagSerializer(ranked, many=True).data)
 
 @extend_schema_view(
     list=extend_schema(
         tags=['Posts'],
         summary='List posts',
-        description='Get posts with filtering, search, and ordering. Query params: ?category__slug=tech&tags__slug=django&search=term&ordering=-created_at'
+        description='Get posts with filtering, search, and ordering. Query params: ?category__slug=tech&tags__slug=django&search=term&ordering=-created_at (or -views_count for the most viewed)'
     ),
     create=extend_schema(
         tags=['Posts'],
@@ -63,7 +151,7 @@ class TagViewSet(viewsets.ReadOnlyModelViewSet):
     retrieve=extend_schema(
         tags=['Posts'],
         summary='Get post details',
-        description='Retrieve a single post with all details including tags, category, and like count.'
+        description='Retrieve a single post with all details including tags, category, like count and view count. Counts as one view per user every BLOG_VIEWS_DEDUP_SECONDS.'
     ),
     update=extend_schema(
         tags=['Posts'],
@@ -78,36 +166,82 @@ class TagViewSet(viewsets.ReadOnlyModelViewSet):
     destroy=extend_schema(
         tags=['Posts'],
         summary='Delete post',
-        description='Delete a post. Only the author can delete their posts.'
+        description='Delete a post. Only the author can delete their posts. The post and its comments disappear at once; their rows are purged in the background.'
     ),
     like=extend_schema(
         tags=['Posts'],
         summary='Toggle like on post',
         description='Like a post if not already liked, unlike if already liked. Returns new like count.'
     ),
+    bulk=extend_schema(
+        tags=['Posts'],
+        summary='Bulk create posts',
+        description=(
+            'Create many posts in one request. The body is a JSON array or NDJSON (application/x-ndjson), '
+            'one post per item. Valid items are inserted; invalid ones are reported by index. '
+            'Returns 201 when every item was created, 207 when some failed, 400 when none were created.'
+        ),
+        request=PostBulkSerializer(many=True),
+        responses={201: PostBulkResultSerializer, 207: PostBulkResultSerializer, 400: PostBulkResultSerializer}
+    ),
     comments=extend_schema(
         tags=['Posts'],
         summary='Post comments',
-        description='GET: List comments for this post. POST: Add a new comment to this post.'
+        description=(
+            'GET: Top-level comments of this post, newest first and paginated, each with its nested replies '
+            '(oldest first). ?depth=N limits the reply levels returned; ?thread=<comment id> returns only that '
+            'comment and its replies. POST: Add a comment to this post, or a reply with "parent": <comment id>.'
+        ),
+        parameters=[
+            OpenApiParameter('depth', int, description='Reply levels to include below each comment (default: all).'),
+            OpenApiParameter('thread', int, description='Only return this comment and its replies.'),
+        ],
+        responses=CommentThreadSerializer(many=True)
     )
 )
 class PostViewSet(viewsets.ModelViewSet):
     """
     A viewset for CRUD operations on blog posts.
     """
-    queryset = Post.objects.select_related('author', 'category').prefetch_related('tags').all().order_by('-created_at')
+    queryset = Post.objects.select_related('author', 'category').prefetch_related('tags').annotate(likes_total=Count('likes', distinct=True)).order_by('-created_at')
     serializer_class = PostSerializer
     permission_classes = [permissions.IsAuthenticated, IsAuthorOrReadOnly]
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
-    filterset_fields = ['category__slug', 'tags__slug', 'author__username']
+    filterset_class = PostFilter #* slugs resolved to ids in memory, see blog.slugs
     search_fields = ['title', 'content', 'author__username', 'category__name', 'tags__name']
-    ordering_fields = ['created_at', 'updated_at', 'likes_count']
+    ordering_fields = ['created_at', 'updated_at', 'likes_count', 'views_count']
     ordering = ['-created_at']
+    throttle_classes = [PostCreateThrottle] #* counts POSTs only: create (bulk has its own rate)
 
     def perform_create(self, serializer):
         serializer.save()
+
+    def perform_destroy(self, instance):
+        soft_delete_post(instance) #* the cascade runs in the background, see blog.deletion
+
+    def retrieve(self, request, *args, **kwargs):
+        response = super().retrieve(request, *args, **kwargs)
+        record_view(response.data['id'], request.user, request.META) #* buffered in memory, see blog.viewcounts
+        return response
+
+    @action(detail=False, methods=['post'], parser_classes=[JSONParser, NDJSONParser], throttle_classes=[PostBulkThrottle])
+    def bulk(self, request):
+        items = request.data
+        if not isinstance(items, list):
+            raise ValidationError({'detail': 'Expected a JSON array or an NDJSON body of posts.'})
+        max_items = getattr(settings, 'BLOG_BULK_MAX_ITEMS', 5000)
+        if len(items) > max_items:
+            raise ValidationError({'detail': f'At most {max_items} posts can be created per request.'})
+        ids, errors = bulk_create_posts(request.user, items, context=self.get_serializer_context())
+        if not errors:
+            response_status = status.HTTP_201_CREATED
+        elif ids:
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = status.HTTP_400_BAD_REQUEST
+        return Response({'created': len(ids), 'ids': ids, 'errors': errors}, status=response_status)
     
-    @action(detail=True, methods=['post'], permission_classes=[permissions.IsAuthenticated])
+    @action(detail=True, methods=['post'], permission_classes=[permissions.IsAuthenticated], throttle_classes=[LikeThrottle])
     def like(self, request, pk=None):
         post = self.get_object()
         like, created = PostLike.objects.get_or_create(user=request.user, post=post)
@@ -117,14 +251,15 @@ class PostViewSet(viewsets.ModelViewSet):
             return Response({'status': 'unliked', 'likes_count': post.likes_count})
         return Response({'status': 'liked', 'likes_count': post.likes_count}, status=status.HTTP_201_CREATED)
 
-    @action(detail=True, methods=['get', 'post'], permission_classes=[permissions.IsAuthenticated])
+    @action(detail=True, methods=['get', 'post'], permission_classes=[permissions.IsAuthenticated], throttle_classes=[CommentCreateThrottle])
     def comments(self, request, pk=None):
         post = self.get_object()
         if request.method == 'GET':
-            comments = post.comments.select_related('author').all().order_by('-created_at')
-            serializer = CommentSerializer(comments, many=True)
-            return Response(serializer.data)
-        serializer = CommentSerializer(data=request.data)
+            depth = parse_reply_depth(request.query_params.get('depth'))
+            roots = self.paginate_queryset(root_comments(post.pk, thread=request.query_params.get('thread')))
+            comments = CommentSerializer(subtree_queryset(post.pk, roots, depth=depth), many=True).data
+            return self.get_paginated_response(nest_comments(roots, comments))
+        serializer = CommentSerializer(data=request.data, context={'post': post})
         serializer.is_valid(raise_exception=True)
         serializer.save(author=request.user, post=post) #* Associate comment with post and author
         return Response(serializer.data, status=status.HTTP_201_CREATED)
@@ -158,7 +293,7 @@ class PostViewSet(viewsets.ModelViewSet):
     destroy=extend_schema(
         tags=['Comments'],
         summary='Delete comment',
-        description='Delete a comment. Only the author can delete their comments.'
+        description='Delete a comment and its replies. Only the author can delete their comments. The rows are purged in the background.'
     ),
     like=extend_schema(
         tags=['Comments'],
@@ -170,18 +305,105 @@ class CommentViewSet(viewsets.ModelViewSet):
     """
     A viewset for CRUD operations on comments.
     """
-    queryset = Comment.objects.select_related('author', 'post').prefetch_related('likes').all().order_by('-created_at')
+    queryset = Comment.objects.select_related('author', 'post').annotate(likes_total=Count('likes')).order_by('-created_at')
     serializer_class = CommentSerializer
     permission_classes = [permissions.IsAuthenticated, IsAuthorOrReadOnly]
+    throttle_classes = [CommentCreateThrottle] #* counts POSTs only: create
 
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user)
+        parent = serializer.validated_data.get('parent')
+        if parent is not None: #* a reply belongs to the post of the comment it answers
+            serializer.save(author=self.request.user, post=parent.post)
+        else:
+            serializer.save(author=self.request.user)
 
-    @action(detail=True, methods=['post'], permission_classes=[permissions.IsAuthenticated])
+    def perform_destroy(self, instance):
+        soft_delete_comment(instance) #* hides its replies too, see blog.deletion
+
+    @action(detail=True, methods=['post'], permission_classes=[permissions.IsAuthenticated], throttle_classes=[LikeThrottle])
     def like(self, request, pk=None):
         comment = self.get_object()
         like, created = CommentLike.objects.get_or_create(user=request.user, comment=comment)
         if not created:
             like.delete()
             return Response({'status': 'unliked', 'likes_count': comment.likes_count})
-        return Response({'status': 'liked', 'likes_count': comment.likes_count})
\ No newline at end of file
+        return Response({'status': 'liked', 'likes_count': comment.likes_count})
+
+
+@extend_schema_view(
+    list=extend_schema(
+        tags=['Posts'],
+        summary='Home timeline',
+        description='Posts from the people you follow, newest first. The timeline is materialized per user, so a page costs the same no matter how many accounts you follow.'
+    )
+)
+class FeedViewSet(viewsets.GenericViewSet):
+    """
+    The authenticated user's home timeline (see blog.timelines).
+    """
+    serializer_class = PostSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    filter_backends = []
+
+    def get_queryset(self):
+        return get_timeline(self.request.user)
+
+    def list(self, request):
+        page = self.paginate_queryset(self.get_queryset().values_list('post_id', flat=True))
+        posts = PostViewSet.queryset.in_bulk(page)
+        serializer = self.get_serializer([posts[pk] for pk in page if pk in posts], many=True)
+        return self.get_paginated_response(serializer.data)
+
+
+class ExportView(APIView):
+    """
+    Streams a whole table as NDJSON (default) or CSV (?format=csv) for analytics jobs.
+    Rows are read in fixed-size chunks and written as they arrive, so memory use does
+    not depend on the table size.
+    """
+    permission_classes = [permissions.IsAdminUser]
+    renderer_classes = [NDJSONRenderer, CSVRenderer]
+
+    @staticmethod
+    def _parse_since(value):
+        since = parse_datetime(value)
+        if since is None:
+            day = parse_date(value)
+            if day is None:
+                raise ValidationError({'since': 'Expected an ISO 8601 date or datetime.'})
+            since = datetime.combine(day, time.min)
+        if timezone.is_naive(since):
+            since = timezone.make_aware(since)
+        return since
+
+    @extend_schema(
+        tags=['Export'],
+        summary='Export a dataset',
+        description=(
+            'Admin only. Streams every row of posts, post_tags, comments, post_likes, comment_likes or profiles '
+            'as NDJSON (default) or CSV (?format=csv). With ?since=<ISO date/datetime> only rows changed '
+            'at or after that moment are returned (updated_at, or created_at for likes).'
+        ),
+        parameters=[OpenApiParameter('since', OpenApiTypes.DATETIME, description='Only export rows changed at or after this moment.')],
+        responses={(200, 'application/x-ndjson'): OpenApiTypes.STR, (200, 'text/csv'): OpenApiTypes.STR}
+    )
+    def get(self, request, resource):
+        export = EXPORT_RESOURCES.get(resource)
+        if export is None:
+            raise NotFound(f'Unknown export "{resource}". Choose one of: {", ".join(EXPORT_RESOURCES)}.')
+        since = request.query_params.get('since')
+        if since is not None:
+            if export.since_field is None:
+                raise ValidationError({'since': f'"{resource}" does not support incremental exports.'})
+            since = self._parse_since(since)
+        renderer = request.accepted_renderer
+        if isinstance(request._request, ASGIRequest): #* Django drains sync iterators into memory under ASGI
+            content = renderer.astream(export.fields, aexport_rows(export, since=since))
+        else:
+            content = renderer.stream(export.fields, export_rows(export, since=since))
+        response = StreamingHttpResponse(
+            content,
+            content_type=f'{renderer.media_type}; charset={renderer.charset}',
+        )
+        response['Content-Disposition'] = f'attachment; filename="{resource}.{renderer.format}"'
+        return response
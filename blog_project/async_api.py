@@ -0,0 +1,80 @@
+"""
+Minimal async counterparts of DRF's APIView and PageNumberPagination for the hot read endpoints.
+
+DRF views are synchronous, so under ASGI every request holds a worker thread until the
+response is written. These views run on the event loop instead: authentication goes through
+`CachedJWTAuthentication.aauthenticate`, queries use Django's async ORM API and payloads are
+serialized with the regular DRF serializers once every relation they touch has been loaded.
+"""
+from django.http import HttpResponse, JsonResponse
+from django.views import View
+from rest_framework import exceptions
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from profiles.authentication import CachedJWTAuthentication
+from .renderers import FastJSONRenderer
+
+
+class AsyncAPIView(View):
+    """
+    Async read-only view that requires an authenticated user (like IsAuthenticated).
+    Subclasses implement `async def get(...)` and return `self.respond(data)`.
+    Errors use the same {"detail": ...} bodies as DRF.
+    """
+    http_method_names = ['get', 'head', 'options']
+
+    async def dispatch(self, request, *args, **kwargs):
+        authenticator = CachedJWTAuthentication()
+        try:
+            result = await authenticator.aauthenticate(request)
+            if result is None:
+                raise exceptions.NotAuthenticated()
+            request.user, request.auth = result
+            return await super().dispatch(request, *args, **kwargs)
+        except exceptions.APIException as exc:
+            data = exc.detail if isinstance(exc.detail, dict) else {'detail': exc.detail}
+            response = JsonResponse(data, status=exc.status_code)
+            if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+                response.status_code = 401
+                response['WWW-Authenticate'] = authenticator.authenticate_header(request)
+            return response
+
+    def respond(self, data, status=200):
+        return HttpResponse(FastJSONRenderer().render(data), status=status, content_type='application/json')
+
+
+class AsyncPageNumberPagination:
+    """
+    Same query parameters and response envelope as DRF's PageNumberPagination
+    (?page=N, {"count", "next", "previous", "results"}), using acount() and a sliced query.
+    """
+    page_query_param = 'page'
+
+    def __init__(self, page_size=None):
+        self.page_size = page_size or api_settings.PAGE_SIZE
+
+    async def paginate(self, request, queryset):
+        try:
+            self.page = int(request.GET.get(self.page_query_param, 1))
+        except ValueError:
+            raise exceptions.NotFound('Invalid page.')
+        self.count = await queryset.acount()
+        last_page = max(1, -(-self.count // self.page_size))
+        if not 1 <= self.page <= last_page:
+            raise exceptions.NotFound('Invalid page.')
+        self.request = request
+        offset = (self.page - 1) * self.page_size
+        return [obj async for obj in queryset[offset:offset + self.page_size]]
+
+    def get_response_data(self, results):
+        url = self.request.build_absolute_uri()
+        next_url = previous_url = None
+        if self.page * self.page_size < self.count:
+            next_url = replace_query_param(url, self.page_query_param, self.page + 1)
+        if self.page > 1:
+            previous_url = (
+                remove_query_param(url, self.page_query_param) if self.page == 2
+                else replace_query_param(url, self.page_query_param, self.page - 1)
+            )
+        return {'count': self.count, 'next': next_url, 'previous': previous_url, 'results': results}
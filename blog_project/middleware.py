@@ -0,0 +1,155 @@
+"""
+Negotiated response compression (Brotli when the `brotli` package is installed, gzip otherwise).
+
+Unlike django.middleware.gzip.GZipMiddleware it skips bodies smaller than
+RESPONSE_COMPRESSION['MIN_SIZE'] (compressing a few hundred bytes costs more CPU than it saves
+on the wire), prefers Brotli when the client accepts it and runs natively under both WSGI
+and ASGI, so the async views do not pay a thread hop per response.
+Responses that already carry a Content-Encoding (e.g. the precomputed schema) are left alone.
+
+Only the API content types in RESPONSE_COMPRESSION['CONTENT_TYPES'] are compressed. HTML pages
+(the admin, the browsable API) carry CSRF tokens next to reflected input, and compressing them
+would open them to BREACH-style length oracles, so they are sent as-is.
+"""
+import gzip
+import re
+import zlib
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError: #* optional dependency
+    brotli = None
+
+_DEFAULTS = {
+    'MIN_SIZE': 1024,
+    'GZIP_LEVEL': 6,
+    'BROTLI_QUALITY': 4,
+    'CONTENT_TYPES': (
+        'application/json',
+        'application/x-ndjson',
+        'text/csv',
+        'application/vnd.oai.openapi',
+        'application/vnd.oai.openapi+json',
+    ),
+}
+
+_accept_encoding_re = re.compile(r'\s*([\w*-]+)\s*(?:;\s*q\s*=\s*([0-9.]+))?\s*')
+
+
+def compression_settings():
+    return {**_DEFAULTS, **getattr(settings, 'RESPONSE_COMPRESSION', {})}
+
+
+def accepted_encodings(header):
+    """
+    Returns the content-codings accepted by an Accept-Encoding header (those with q > 0).
+    """
+    accepted = set()
+    for part in header.split(','):
+        match = _accept_encoding_re.fullmatch(part)
+        if match is None:
+            continue
+        coding, quality = match.group(1).lower(), match.group(2)
+        try:
+            if quality is None or float(quality) > 0:
+                accepted.add(coding)
+        except ValueError:
+            continue
+    return accepted
+
+
+def is_compressible(response, content_types):
+    """True when the media type of the response (parameters stripped) is one of `content_types`."""
+    media_type = response.get('Content-Type', '').split(';', 1)[0].strip().lower()
+    return media_type in content_types
+
+
+def choose_encoding(request, streaming=False):
+    """
+    Picks the coding for a response to `request`. Streaming bodies are gzip-only: they are
+    compressed chunk by chunk as they are produced, so memory use stays flat.
+    """
+    accepted = accepted_encodings(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+    if brotli is not None and 'br' in accepted and not streaming:
+        return 'br'
+    if 'gzip' in accepted:
+        return 'gzip'
+    return None
+
+
+def compress(content, encoding, options):
+    if encoding == 'br':
+        return brotli.compress(content, quality=options['BROTLI_QUALITY'])
+    return gzip.compress(content, compresslevel=options['GZIP_LEVEL'], mtime=0)
+
+
+def gzip_stream(chunks, level):
+    """Compresses an iterable of byte chunks into one gzip stream."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+async def agzip_stream(chunks, level):
+    """Async counterpart of gzip_stream for the streaming responses of async views."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    async for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+class CompressionMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.options = compression_settings()
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.process_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.process_response(request, await self.get_response(request))
+
+    def process_response(self, request, response):
+        if response.has_header('Content-Encoding') or not 200 <= response.status_code < 300:
+            return response
+        if not is_compressible(response, self.options['CONTENT_TYPES']):
+            return response
+        if not response.streaming and len(response.content) < self.options['MIN_SIZE']:
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = choose_encoding(request, streaming=response.streaming)
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            stream = agzip_stream if response.is_async else gzip_stream
+            response.streaming_content = stream(response.streaming_content, self.options['GZIP_LEVEL'])
+            del response['Content-Length']
+        else:
+            compressed = compress(response.content, encoding, self.options)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
+
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'): #* the bytes changed, so a strong ETag would be wrong
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoding
+        return response
@@ -0,0 +1,46 @@
+"""
+JSON renderer for API payloads backed by orjson when it is installed.
+
+orjson encodes the serializer output (dicts, lists, strings, numbers) in C and produces the
+same compact UTF-8 document as DRF's JSONRenderer with the default COMPACT_JSON/UNICODE_JSON
+settings. Values orjson does not handle natively (datetimes, Decimals, lazy translations, ...)
+go through DRF's own encoder, so they render exactly as before. orjson writes U+2028/U+2029
+raw; they are escaped afterwards, as DRF does, so the output is also valid JavaScript.
+One difference is kept: orjson writes NaN/Infinity as null where DRF raises under STRICT_JSON.
+Checking for them would mean walking the whole payload in Python, which costs as much as the
+stdlib encoder, and no field of this API produces a non-finite number.
+Without orjson, or when the client asks for indented output, the renderer falls back to the
+stdlib json path.
+"""
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError: #* optional dependency
+    orjson = None
+
+#* UTF-8 of U+2028 LINE SEPARATOR and U+2029 PARAGRAPH SEPARATOR, escaped the way DRF does
+_LINE_SEPARATORS = ((b'\xe2\x80\xa8', b'\\u2028'), (b'\xe2\x80\xa9', b'\\u2029'))
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    Drop-in replacement for rest_framework.renderers.JSONRenderer.
+    """
+    def __init__(self):
+        self._default = JSONEncoder().default
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type or '', renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=self._default, option=orjson.OPT_PASSTHROUGH_DATETIME)
+        except TypeError: #* orjson.JSONEncodeError, e.g. integers wider than 64 bits
+            return super().render(data, accepted_media_type, renderer_context)
+        if b'\xe2\x80' in ret:
+            for raw, escaped in _LINE_SEPARATORS:
+                ret = ret.replace(raw, escaped)
+        return ret
@@ -0,0 +1,157 @@
+"""
+Precomputed OpenAPI schema.
+
+`python manage.py build_openapi_schema` renders the schema once (YAML and JSON) and writes
+gzip-compressed artifacts to OPENAPI_SCHEMA_DIR. `CachedSchemaView` serves them from memory
+with strong ETags, so /api/schema/ no longer introspects every viewset on each hit.
+drf_spectacular is only imported when the schema has to be generated in-process.
+"""
+import gzip
+import hashlib
+import threading
+from pathlib import Path
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.views import View
+
+from .middleware import accepted_encodings
+
+SCHEMA_FORMATS = {
+    'yaml': ('application/vnd.oai.openapi', 'schema.yaml.gz'),
+    'json': ('application/vnd.oai.openapi+json', 'schema.json.gz'),
+}
+
+
+def schema_artifact_dir():
+    return Path(getattr(settings, 'OPENAPI_SCHEMA_DIR', Path(settings.BASE_DIR) / 'openapi'))
+
+
+def generate_schema():
+    """
+    Generates the schema in-process and returns {format: rendered bytes}.
+    """
+    from drf_spectacular.renderers import OpenApiJsonRenderer, OpenApiYamlRenderer
+    from drf_spectacular.settings import spectacular_settings
+
+    generator = spectacular_settings.DEFAULT_GENERATOR_CLASS()
+    schema = generator.get_schema(request=None, public=True)
+    return {
+        'yaml': OpenApiYamlRenderer().render(schema, renderer_context={}),
+        'json': OpenApiJsonRenderer().render(schema, renderer_context={}),
+    }
+
+
+def write_schema_artifacts(directory=None):
+    """
+    Writes the gzip-compressed schema artifacts and returns the paths written.
+    """
+    directory = Path(directory or schema_artifact_dir())
+    directory.mkdir(parents=True, exist_ok=True)
+    written = []
+    for fmt, content in generate_schema().items():
+        path = directory / SCHEMA_FORMATS[fmt][1]
+        path.write_bytes(gzip.compress(content, compresslevel=9, mtime=0))
+        written.append(path)
+    return written
+
+
+class _SchemaDocument:
+    """One rendered schema held in memory, both raw and gzip-compressed."""
+    def __init__(self, content, compressed=None):
+        self.content = content
+        self.compressed = compressed if compressed is not None else gzip.compress(content, compresslevel=9, mtime=0)
+        digest = hashlib.sha256(content).hexdigest()[:32]
+        self.etag = f'"{digest}"'
+        self.gzip_etag = f'"{digest}-gzip"' #* a different content-coding needs its own strong ETag
+
+
+_documents = {}
+_documents_lock = threading.Lock()
+
+
+def _load_documents():
+    directory = schema_artifact_dir()
+    documents = {}
+    for fmt, (_, filename) in SCHEMA_FORMATS.items():
+        path = directory / filename
+        if not path.exists():
+            break
+        compressed = path.read_bytes()
+        documents[fmt] = _SchemaDocument(gzip.decompress(compressed), compressed)
+    else:
+        return documents
+    # Missing artifact: fall back to generating the schema once for this process.
+    return {fmt: _SchemaDocument(content) for fmt, content in generate_schema().items()}
+
+
+def get_schema_document(fmt):
+    if not _documents:
+        with _documents_lock:
+            if not _documents:
+                _documents.update(_load_documents())
+    return _documents[fmt]
+
+
+def reset_schema_cache():
+    with _documents_lock:
+        _documents.clear()
+
+
+class CachedSchemaView(View):
+    """
+    Serves the precomputed OpenAPI schema. YAML by default, JSON with ?format=json
+    (or ?format=openapi-json / an Accept header asking for JSON).
+
+    When OPENAPI_SCHEMA_PRECOMPUTED is off (the default while DEBUG is on) the request is
+    handed to drf_spectacular's SpectacularAPIView, so schema changes show up immediately
+    during development.
+    """
+    http_method_names = ['get', 'head', 'options']
+
+    def get(self, request, *args, **kwargs):
+        if not getattr(settings, 'OPENAPI_SCHEMA_PRECOMPUTED', not settings.DEBUG):
+            from drf_spectacular.views import SpectacularAPIView
+            return SpectacularAPIView.as_view()(request, *args, **kwargs)
+
+        fmt = 'yaml'
+        requested = request.GET.get('format', '')
+        if requested in ('json', 'openapi-json') or (not requested and 'json' in request.headers.get('Accept', '')):
+            fmt = 'json'
+        document = get_schema_document(fmt)
+
+        use_gzip = 'gzip' in accepted_encodings(request.headers.get('Accept-Encoding', ''))
+        etag = document.gzip_etag if use_gzip else document.etag
+        if_none_match = request.headers.get('If-None-Match', '')
+        if etag in [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')] or if_none_match.strip() == '*':
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(
+                document.compressed if use_gzip else document.content,
+                content_type=SCHEMA_FORMATS[fmt][0],
+            )
+            if use_gzip:
+                response['Content-Encoding'] = 'gzip'
+            response['Content-Disposition'] = f'inline; filename="schema.{fmt}"'
+        response['ETag'] = etag
+        response['Cache-Control'] = 'public, no-cache'
+        patch_vary_headers(response, ('Accept', 'Accept-Encoding'))
+        return response
+
+
+class SwaggerUIView(View):
+    """
+    Swagger UI for the schema served at `url_name`. drf_spectacular's view (and the schema
+    tooling it pulls in) is imported on the first request instead of when the URLconf loads.
+    """
+    http_method_names = ['get', 'head', 'options']
+    url_name = 'schema'
+    _views = {}
+
+    def get(self, request, *args, **kwargs):
+        view = self._views.get(self.url_name)
+        if view is None:
+            from drf_spectacular.views import SpectacularSwaggerView
+            view = self._views[self.url_name] = SpectacularSwaggerView.as_view(url_name=self.url_name)
+        return view(request, *args, **kwargs)
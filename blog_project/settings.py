@@ -44,12 +44,14 @@ INSTALLED_APPS = [
     'django_filters',
     'drf_spectacular',
     # Your apps
+    'jobs',
     'profiles',
     'blog',
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'blog_project.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -134,8 +136,12 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    'DEFAULT_RENDERER_CLASSES': (
+        'blog_project.renderers.FastJSONRenderer', # orjson when installed, stdlib json otherwise
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'profiles.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
@@ -147,15 +153,68 @@ REST_FRAMEWORK = {
     ),
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 6,
+    # Write rates enforced by blog.throttling (per user, per IP for anonymous requests)
+    'DEFAULT_THROTTLE_RATES': {
+        'like': '60/min',
+        'comment': '20/min',
+        'post_create': '30/hour',
+        'post_bulk': '60/hour', # per BLOG_BULK_BATCH_SIZE posts, so up to 30,000 imported posts an hour
+    },
 }
 from datetime import timedelta
 
+# Blog app tuning
+BLOG_BULK_MAX_ITEMS = 5000 # max posts per POST /posts/bulk/ request
+BLOG_BULK_BATCH_SIZE = 500 # rows per INSERT statement in bulk writes
+BLOG_EXPORT_CHUNK_SIZE = 2000 # rows fetched per cursor round-trip by /export/
+BLOG_ASYNC_CACHE_TIMEOUT = 30 # seconds the async detail endpoints keep serialized payloads
+BLOG_TIMELINE_MAX_LENGTH = 500 # entries kept per home timeline
+BLOG_TIMELINE_ACTIVE_DAYS = 14 # timelines unread for longer are rebuilt on read instead of fanned out to
+BLOG_TIMELINE_FANOUT_BATCH = 1000 # followers per fan-out INSERT
+BLOG_VIEWS_FLUSH_SECONDS = 10 # how often buffered post views are written to Post.views_count
+BLOG_VIEWS_DEDUP_SECONDS = 1800 # a user (or IP) counts as one view per post within this window
+BLOG_VIEWS_SHARDS = 16 # in-memory counter shards per process
+BLOG_SLUG_CACHE_SECONDS = 300 # how long a process trusts its cached category/tag slug -> id mappings
+BLOG_COMMENT_MAX_DEPTH = 20 # reply nesting levels allowed (at most 35, see Comment.PATH_STEP)
+BLOG_THROTTLE_STORE = 'memory' # 'memory' (per-process token buckets) or 'cache' (counters shared through CACHES)
+BLOG_THROTTLE_CACHE_ALIAS = 'default' # cache used when BLOG_THROTTLE_STORE = 'cache'
+BLOG_PURGE_BATCH_SIZE = 500 # soft-deleted rows physically deleted per purge batch (see blog/deletion.py)
+BLOG_PURGE_BATCHES_PER_JOB = 20 # batches per purge job run before it queues itself again
+BLOG_PURGE_DELAY_SECONDS = 5 # wait after a delete before the purge job starts, so bursts share one run
+BLOG_STARTUP_MAX_SECONDS = 1.5 # cold-start budget of a WSGI worker, enforced by the profile_startup test
+
+# Background jobs for post-write side effects (see jobs/queue.py).
+# ThreadPoolBackend runs them in-process after commit; switch to 'jobs.backends.DatabaseBackend'
+# for a durable queue and run `python manage.py run_jobs` as a separate worker.
+JOBS = {
+    'BACKEND': 'jobs.backends.ThreadPoolBackend',
+    'WORKERS': 2,
+}
+
+# gzip/Brotli compression of API responses (see blog_project/middleware.py)
+RESPONSE_COMPRESSION = {
+    'MIN_SIZE': 1024, # bytes; smaller bodies are sent as-is
+    'GZIP_LEVEL': 6,
+    'BROTLI_QUALITY': 4, # used when the optional `brotli` package is installed
+    # only API payloads; HTML (admin, browsable API) carries CSRF tokens and is never compressed (BREACH)
+    'CONTENT_TYPES': ('application/json', 'application/x-ndjson', 'text/csv', 'application/vnd.oai.openapi', 'application/vnd.oai.openapi+json'),
+}
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
+# Opt-in: users resolved from JWTs are cached for the token lifetime, capped by TIMEOUT (seconds),
+# only when CACHE_ALIAS names a cache shared by every worker (Redis, Memcached), so the eviction
+# on User save/delete reaches all of them. With the default process-local LocMemCache (no CACHES
+# configured) nothing is cached and every request selects the user, as plain JWTAuthentication does.
+AUTH_USER_CACHE = {
+    'CACHE_ALIAS': 'default',
+    'TIMEOUT': 300,
+}
+
 DJOSER = {
     'LOGIN_FIELD': 'username',
     'USER_CREATE_PASSWORD_RETYPE': False,
@@ -184,6 +243,12 @@ SPECTACULAR_SETTINGS = {
         {'name': 'Tags', 'description': 'Content tags (read-only).'},
         {'name': 'Posts', 'description': 'Create, list, filter, search, like, and comment on posts.'},
         {'name': 'Comments', 'description': 'CRUD and like operations for comments.'},
+        {'name': 'Export', 'description': 'Admin-only streaming dataset exports (NDJSON/CSV).'},
     ],
     'POSTPROCESSING_HOOKS': ['blog_project.spectacular_hooks.custom_postprocessing_hook'],
-}
\ No newline at end of file
+}
+
+# /api/schema/ serves the artifacts written by `python manage.py build_openapi_schema`.
+# While DEBUG is on the schema is generated live instead, so view changes show up immediately.
+OPENAPI_SCHEMA_DIR = BASE_DIR / 'openapi'
+OPENAPI_SCHEMA_PRECOMPUTED = not DEBUG
\ No newline at end of file
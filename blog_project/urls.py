@@ -18,16 +18,16 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
-from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
+from .schema import CachedSchemaView, SwaggerUIView
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     # Swagger UI endpoints
-    path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
-    path('api/docs/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
+    path('api/schema/', CachedSchemaView.as_view(), name='schema'), #* precomputed, see `manage.py build_openapi_schema`
+    path('api/docs/', SwaggerUIView.as_view(url_name='schema'), name='swagger-ui'), #* imports drf_spectacular on first use
 
     # Djoser auth (JWT)
-    path('api/auth/', include('djoser.urls')),
+    path('api/auth/', include('profiles.auth_urls')), #* djoser.urls with soft account deletion
     path('api/auth/', include('djoser.urls.jwt')),
 
     # API apps
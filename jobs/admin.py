@@ -0,0 +1,8 @@
+from django.contrib import admin
+from .models import Job
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'name', 'status', 'attempts', 'run_after', 'updated_at')
+    list_filter = ('status', 'name')
+    search_fields = ('name', 'dedup_key')
@@ -0,0 +1,126 @@
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from .models import Job
+from .queue import get_job, run_attempt, run_with_retries
+
+
+class ImmediateBackend:
+    """
+    Runs every job inline right after the surrounding transaction commits.
+    """
+    def __init__(self, options):
+        self.options = options
+
+    def enqueue(self, name, args, kwargs, dedup_key=None, run_after=None):
+        transaction.on_commit(lambda: run_with_retries(name, args, kwargs, sleep=time.sleep))
+
+
+class ThreadPoolBackend:
+    """
+    Runs jobs on an in-process thread pool (JOBS['WORKERS'] threads), submitted once the
+    surrounding transaction commits. Nothing is persisted: jobs still queued when the
+    process exits are lost, which is fine for derived data that can be rebuilt.
+    Delayed jobs and retries wait in a heap watched by one scheduler thread, which hands
+    them to the pool when they are due, so pool threads only ever run jobs.
+    """
+    def __init__(self, options):
+        self.options = options
+        self._executor = None
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._timers = [] #* heap of (monotonic due time, sequence, args of _run)
+        self._timers_changed = threading.Condition()
+        self._sequence = itertools.count()
+        self._scheduler = None
+        self._stopping = False
+
+    @property
+    def executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.options['WORKERS'], thread_name_prefix='jobs')
+        return self._executor
+
+    def enqueue(self, name, args, kwargs, dedup_key=None, run_after=None):
+        transaction.on_commit(lambda: self._submit(name, args, kwargs, dedup_key, run_after))
+
+    def _submit(self, name, args, kwargs, dedup_key, run_after):
+        if dedup_key is not None:
+            with self._lock:
+                if dedup_key in self._pending:
+                    return
+                self._pending.add(dedup_key)
+        delay = (run_after - timezone.now()).total_seconds() if run_after is not None else 0
+        self._schedule(delay, name, args, kwargs, dedup_key, 1)
+
+    def _schedule(self, delay, *run_args):
+        if delay <= 0:
+            self.executor.submit(self._run, *run_args)
+            return
+        with self._timers_changed:
+            heapq.heappush(self._timers, (time.monotonic() + delay, next(self._sequence), run_args))
+            if self._scheduler is None:
+                self._scheduler = threading.Thread(target=self._run_scheduler, name='jobs-scheduler', daemon=True)
+                self._scheduler.start()
+            self._timers_changed.notify()
+
+    def _run_scheduler(self):
+        while True:
+            with self._timers_changed:
+                while not self._stopping and (not self._timers or self._timers[0][0] > time.monotonic()):
+                    self._timers_changed.wait(self._timers[0][0] - time.monotonic() if self._timers else None)
+                if self._stopping:
+                    return
+                _, _, run_args = heapq.heappop(self._timers)
+            self.executor.submit(self._run, *run_args)
+
+    def shutdown(self, wait=True):
+        """
+        Stops the scheduler (dropping the jobs still waiting for their delay) and the pool.
+        """
+        with self._timers_changed:
+            self._stopping = True
+            self._timers.clear()
+            self._timers_changed.notify()
+        if self._scheduler is not None and wait:
+            self._scheduler.join()
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+
+    def _run(self, name, args, kwargs, dedup_key, attempt):
+        try:
+            if dedup_key is not None:
+                with self._lock: #* from here on the job counts as running, not queued
+                    self._pending.discard(dedup_key)
+            _, retry_delay = run_attempt(name, args, kwargs, attempt)
+            if retry_delay is not None:
+                self._schedule(retry_delay, name, args, kwargs, None, attempt + 1)
+        finally:
+            close_old_connections()
+
+
+class DatabaseBackend:
+    """
+    Durable queue: every job is a row in the Job table, inserted in the caller's transaction
+    (so it is committed, or rolled back, together with the write that produced it).
+    `python manage.py run_jobs` claims and executes them.
+    """
+    def __init__(self, options):
+        self.options = options
+
+    def enqueue(self, name, args, kwargs, dedup_key=None, run_after=None):
+        Job.objects.bulk_create(
+            [Job(
+                name=name, args=args, kwargs=kwargs, dedup_key=dedup_key,
+                max_attempts=get_job(name).max_attempts, run_after=run_after or timezone.now(),
+            )],
+            ignore_conflicts=True, #* a queued job with the same dedup_key already exists
+        )
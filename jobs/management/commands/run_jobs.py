@@ -0,0 +1,68 @@
+import signal
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+
+from jobs.queue import jobs_settings
+from jobs.worker import claim_jobs, execute_job, requeue_stale_jobs, run_in_process
+
+
+class Command(BaseCommand):
+    help = (
+        'Runs jobs from the durable queue (JOBS["BACKEND"] = "jobs.backends.DatabaseBackend") '
+        'on a thread or process pool until stopped.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=None, help='Pool size (defaults to JOBS["WORKERS"]).')
+        parser.add_argument('--pool', choices=['thread', 'process'], default='thread',
+                            help='Use processes for CPU-bound jobs (thumbnails, indexing).')
+        parser.add_argument('--poll-interval', type=float, default=1.0, help='Seconds to sleep when the queue is empty.')
+        parser.add_argument('--lock-timeout', type=int, default=600,
+                            help='Seconds after which a RUNNING job is considered abandoned and re-queued.')
+        parser.add_argument('--once', action='store_true', help='Exit once no job is due instead of polling.')
+
+    def handle(self, *args, **options):
+        workers = options['workers'] or jobs_settings()['WORKERS']
+        if options['pool'] == 'process':
+            connections.close_all() #* never share a database connection with forked children
+            pool, run = ProcessPoolExecutor(max_workers=workers), run_in_process
+        else:
+            pool, run = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='jobs'), self._run_in_thread
+
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+        self.stdout.write(f'Running jobs with {workers} {options["pool"]} worker(s). Press Ctrl+C to stop.')
+        succeeded = failed = 0
+        try:
+            while not self.stopping:
+                requeue_stale_jobs(options['lock_timeout'])
+                claimed = claim_jobs(limit=workers * 2)
+                close_old_connections()
+                if not claimed:
+                    if options['once']:
+                        break
+                    time.sleep(options['poll_interval'])
+                    continue
+                done, _ = wait([pool.submit(run, pk) for pk in claimed])
+                for future in done:
+                    if future.result():
+                        succeeded += 1
+                    else:
+                        failed += 1
+        finally:
+            pool.shutdown(wait=True)
+        self.stdout.write(self.style.SUCCESS(f'Stopped: {succeeded} succeeded, {failed} failed.'))
+
+    @staticmethod
+    def _run_in_thread(pk):
+        try:
+            return execute_job(pk)
+        finally:
+            close_old_connections()
+
+    def _stop(self, signum, frame):
+        self.stopping = True
@@ -0,0 +1,42 @@
+from django.db import models
+from django.db.models import Q
+
+
+class Job(models.Model):
+    """
+    A unit of deferred work stored in the database (used by jobs.backends.DatabaseBackend
+    and executed by `python manage.py run_jobs`).
+    """
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (QUEUED, 'Queued'),
+        (RUNNING, 'Running'),
+        (SUCCEEDED, 'Succeeded'),
+        (FAILED, 'Failed'),
+    ]
+
+    name = models.CharField(max_length=200)
+    args = models.JSONField(default=list, blank=True)
+    kwargs = models.JSONField(default=dict, blank=True)
+    dedup_key = models.CharField(max_length=200, null=True, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    run_after = models.DateTimeField()
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['status', 'run_after'], name='jobs_job_status_run_after')]
+        constraints = [
+            #* at most one queued job per dedup key; enqueueing a duplicate is a no-op
+            models.UniqueConstraint(fields=['dedup_key'], condition=Q(status='queued'), name='jobs_job_unique_queued_dedup_key'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
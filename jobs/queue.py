@@ -0,0 +1,122 @@
+"""
+Deferred jobs for post-write side effects.
+
+Register a function with `@job(...)` in an app's `tasks.py` module and call `enqueue(...)`
+from the write path. The function runs later on the backend configured in JOBS['BACKEND']:
+
+- jobs.backends.ThreadPoolBackend (default): in-process thread pool, started after commit.
+- jobs.backends.DatabaseBackend: durable queue in the Job table, executed by `manage.py run_jobs`.
+- jobs.backends.ImmediateBackend: runs inline after commit (handy for debugging).
+
+Job arguments must be JSON-serializable. Failed jobs are retried up to `max_attempts` times
+with exponential backoff.
+"""
+import logging
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger('jobs')
+
+registry = {}
+
+
+def job(name=None, max_attempts=3, retry_delay=5):
+    """
+    Registers the decorated function as a job. `retry_delay` is the delay in seconds before
+    the first retry; it doubles on every further attempt.
+    """
+    def decorator(func):
+        job_name = name or f'{func.__module__}.{func.__name__}'
+        func.job_name = job_name
+        func.max_attempts = max_attempts
+        func.retry_delay = retry_delay
+        registry[job_name] = func
+        return func
+    return decorator
+
+
+def get_job(name):
+    try:
+        return registry[name]
+    except KeyError:
+        raise LookupError(f'No job registered as "{name}". Is it defined in a tasks.py module?')
+
+
+def retry_backoff(func, attempt):
+    """Seconds to wait after failed attempt number `attempt` (1-based)."""
+    return func.retry_delay * 2 ** (attempt - 1)
+
+
+_backend = None
+
+
+def jobs_settings():
+    return {
+        'BACKEND': 'jobs.backends.ThreadPoolBackend',
+        'WORKERS': 2,
+        **getattr(settings, 'JOBS', {}),
+    }
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        options = jobs_settings()
+        _backend = import_string(options['BACKEND'])(options)
+    return _backend
+
+
+def reset_backend():
+    global _backend
+    _backend = None
+
+
+def enqueue(func, args=(), kwargs=None, dedup_key=None, delay=0):
+    """
+    Schedules `func` (a registered job or its name) to run with `args`/`kwargs`.
+    Jobs never run before the current transaction commits; a job enqueued in a transaction
+    that rolls back is dropped. While a job with the same `dedup_key` is still queued,
+    further enqueues with that key are ignored.
+    """
+    name = func if isinstance(func, str) else func.job_name
+    get_job(name) # fail fast on typos
+    get_backend().enqueue(
+        name, list(args), dict(kwargs or {}), dedup_key=dedup_key,
+        run_after=timezone.now() + timedelta(seconds=delay),
+    )
+
+
+def run_attempt(name, args, kwargs, attempt):
+    """
+    Runs attempt number `attempt` (1-based) of a job in-process.
+    Returns (succeeded, retry_delay): `retry_delay` is the number of seconds to wait before the
+    next attempt, or None when the job succeeded or has no attempts left.
+    """
+    func = get_job(name)
+    try:
+        func(*args, **kwargs)
+        return True, None
+    except Exception:
+        if attempt >= func.max_attempts:
+            logger.exception('Job %s failed after %d attempts', name, attempt)
+            return False, None
+        logger.warning('Job %s failed (attempt %d), retrying:\n%s', name, attempt, traceback.format_exc())
+        return False, retry_backoff(func, attempt)
+
+
+def run_with_retries(name, args, kwargs, sleep):
+    """
+    Runs a job in-process, retrying on failure. `sleep(seconds)` waits between attempts.
+    Returns True if an attempt succeeded.
+    """
+    attempt = 1
+    while True:
+        succeeded, retry_delay = run_attempt(name, args, kwargs, attempt)
+        if retry_delay is None:
+            return succeeded
+        sleep(retry_delay)
+        attempt += 1
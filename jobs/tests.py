@@ -0,0 +1,132 @@
+import threading
+from datetime import timedelta
+
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from .backends import DatabaseBackend, ThreadPoolBackend
+from .models import Job
+from .queue import job
+from .worker import claim_jobs, execute_job, requeue_stale_jobs
+
+#* generous bounds: the tests check ordering, not speed, so a loaded machine does not fail them
+TIMEOUT = 10
+ran = {}
+calls = []
+
+
+@job('jobs.tests.record')
+def record(label):
+    calls.append(label)
+    ran.setdefault(label, threading.Event()).set()
+
+
+@job('jobs.tests.flaky', max_attempts=2, retry_delay=600)
+def flaky(label):
+    calls.append(label)
+    raise RuntimeError('always fails')
+
+
+class ThreadPoolBackendTests(SimpleTestCase):
+    def setUp(self):
+        self.backend = ThreadPoolBackend({'WORKERS': 1})
+        ran.clear()
+        calls.clear()
+
+    def tearDown(self):
+        self.backend.shutdown(wait=True)
+        self.assertFalse(self.backend._scheduler and self.backend._scheduler.is_alive())
+
+    def submit(self, name, label, delay=0):
+        ran[label] = threading.Event()
+        self.backend._submit(name, [label], {}, None, timezone.now() + timedelta(seconds=delay))
+
+    def test_delayed_job_does_not_hold_the_only_worker(self):
+        self.submit('jobs.tests.record', 'later', delay=600)
+        self.submit('jobs.tests.record', 'now')
+        self.assertTrue(ran['now'].wait(TIMEOUT)) #* would take 600s if the worker slept for 'later'
+        self.assertFalse(ran['later'].is_set())
+        self.assertEqual(len(self.backend._timers), 1)
+
+    def test_delayed_job_runs_when_due(self):
+        self.submit('jobs.tests.record', 'soon', delay=0.05)
+        self.assertTrue(ran['soon'].wait(TIMEOUT))
+
+    def test_retry_waits_outside_the_worker(self):
+        with self.assertLogs('jobs', 'WARNING'):
+            self.submit('jobs.tests.flaky', 'flaky')
+            self.submit('jobs.tests.record', 'meanwhile')
+            self.assertTrue(ran['meanwhile'].wait(TIMEOUT)) #* queued behind the failed attempt, not its 600s backoff
+        self.assertEqual(calls, ['flaky', 'meanwhile'])
+        [(_, _, run_args)] = self.backend._timers
+        self.assertEqual((run_args[0], run_args[-1]), ('jobs.tests.flaky', 2))
+
+
+class DatabaseQueueTests(TestCase):
+    def setUp(self):
+        calls.clear()
+        self.backend = DatabaseBackend({})
+
+    def enqueue(self, name, label, dedup_key=None, delay=0):
+        self.backend.enqueue(name, [label], {}, dedup_key=dedup_key, run_after=timezone.now() + timedelta(seconds=delay))
+
+    def test_enqueue_ignores_duplicates_while_queued(self):
+        self.enqueue('jobs.tests.record', 'a', dedup_key='k')
+        self.enqueue('jobs.tests.record', 'b', dedup_key='k')
+        self.assertEqual(list(Job.objects.values_list('args', flat=True)), [['a']])
+        self.assertEqual(Job.objects.get().max_attempts, 3)
+
+    def test_claim_takes_due_jobs_once(self):
+        self.enqueue('jobs.tests.record', 'due')
+        self.enqueue('jobs.tests.record', 'later', delay=600)
+        claimed = claim_jobs(limit=10)
+        self.assertEqual(len(claimed), 1)
+        self.assertEqual(claim_jobs(limit=10), [])
+        claimed_job = Job.objects.get(pk=claimed[0])
+        self.assertEqual((claimed_job.status, claimed_job.attempts, claimed_job.args), (Job.RUNNING, 1, ['due']))
+
+    def test_succeeded_job_is_deleted(self):
+        self.enqueue('jobs.tests.record', 'ok')
+        [pk] = claim_jobs(limit=1)
+        self.assertTrue(execute_job(pk))
+        self.assertEqual(calls, ['ok'])
+        self.assertFalse(Job.objects.exists())
+
+    def test_failed_job_is_retried_with_backoff_then_marked_failed(self):
+        self.enqueue('jobs.tests.flaky', 'x')
+        [pk] = claim_jobs(limit=1)
+        with self.assertLogs('jobs', 'WARNING'):
+            self.assertFalse(execute_job(pk))
+        retried = Job.objects.get(pk=pk)
+        self.assertEqual(retried.status, Job.QUEUED)
+        self.assertGreater(retried.run_after, timezone.now() + timedelta(seconds=500))
+        self.assertIn('always fails', retried.last_error)
+        Job.objects.filter(pk=pk).update(run_after=timezone.now())
+        self.assertEqual(claim_jobs(limit=1), [pk])
+        with self.assertLogs('jobs', 'ERROR'):
+            self.assertFalse(execute_job(pk))
+        self.assertEqual(Job.objects.get(pk=pk).status, Job.FAILED)
+
+    def test_unknown_job_is_marked_failed(self):
+        Job.objects.create(name='jobs.tests.missing', run_after=timezone.now())
+        [pk] = claim_jobs(limit=1)
+        self.assertFalse(execute_job(pk))
+        self.assertEqual(Job.objects.get(pk=pk).status, Job.FAILED)
+
+    def test_stale_jobs_are_requeued_until_attempts_run_out(self):
+        long_ago = timezone.now() - timedelta(hours=1)
+        retry = Job.objects.create(name='jobs.tests.record', status=Job.RUNNING, attempts=1, max_attempts=3, locked_at=long_ago, run_after=long_ago)
+        crashing = Job.objects.create(name='jobs.tests.record', status=Job.RUNNING, attempts=3, max_attempts=3, locked_at=long_ago, run_after=long_ago)
+        recent = Job.objects.create(name='jobs.tests.record', status=Job.RUNNING, attempts=1, locked_at=timezone.now(), run_after=long_ago)
+        with self.assertLogs('jobs', 'ERROR'):
+            requeue_stale_jobs(lock_timeout=600)
+        statuses = dict(Job.objects.values_list('pk', 'status'))
+        self.assertEqual(statuses, {retry.pk: Job.QUEUED, crashing.pk: Job.FAILED, recent.pk: Job.RUNNING})
+
+    def test_requeue_drops_a_stale_job_that_was_queued_again(self):
+        long_ago = timezone.now() - timedelta(hours=1)
+        stale = Job.objects.create(name='jobs.tests.record', dedup_key='k', status=Job.RUNNING, attempts=1, locked_at=long_ago, run_after=long_ago)
+        self.enqueue('jobs.tests.record', 'again', dedup_key='k')
+        requeue_stale_jobs(lock_timeout=600)
+        self.assertFalse(Job.objects.filter(pk=stale.pk).exists())
+        self.assertEqual(Job.objects.get().args, ['again'])
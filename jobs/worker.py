@@ -0,0 +1,94 @@
+"""
+Execution side of the durable queue (jobs.backends.DatabaseBackend), used by `manage.py run_jobs`.
+"""
+import logging
+import traceback
+from datetime import timedelta
+
+import django
+from django.apps import apps
+from django.db import IntegrityError, close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+from .queue import get_job, retry_backoff
+
+logger = logging.getLogger('jobs')
+
+
+def _requeue(pk, **fields):
+    try:
+        with transaction.atomic():
+            Job.objects.filter(pk=pk).update(status=Job.QUEUED, locked_at=None, **fields)
+    except IntegrityError:
+        #* an identical job (same dedup_key) was queued meanwhile and will do the work
+        Job.objects.filter(pk=pk).delete()
+
+
+def requeue_stale_jobs(lock_timeout):
+    """
+    Puts back jobs left RUNNING by a worker that died more than `lock_timeout` seconds ago.
+    A job whose attempts are used up is marked FAILED instead: it may be the one that killed
+    the worker (out of memory, segfault), and re-queueing it would kill the next one too.
+    """
+    stale = Job.objects.filter(status=Job.RUNNING, locked_at__lt=timezone.now() - timedelta(seconds=lock_timeout))
+    exhausted = stale.filter(attempts__gte=F('max_attempts')).update(
+        status=Job.FAILED, locked_at=None, last_error='The worker running the last attempt stopped before it finished.',
+    )
+    if exhausted:
+        logger.error('%d job(s) abandoned by a dead worker had no attempts left and were marked failed.', exhausted)
+    for pk in list(stale.values_list('pk', flat=True)):
+        _requeue(pk)
+
+
+def claim_jobs(limit):
+    """
+    Claims up to `limit` due jobs and returns their ids. Each claim is a conditional UPDATE,
+    so concurrent workers never run the same job twice.
+    """
+    now = timezone.now()
+    candidates = Job.objects.filter(status=Job.QUEUED, run_after__lte=now).order_by('run_after', 'pk').values_list('pk', flat=True)[:limit]
+    claimed = []
+    for pk in candidates:
+        if Job.objects.filter(pk=pk, status=Job.QUEUED).update(status=Job.RUNNING, locked_at=now, attempts=F('attempts') + 1):
+            claimed.append(pk)
+    return claimed
+
+
+def execute_job(pk):
+    """
+    Runs one claimed job and records the outcome: succeeded jobs are deleted, failed ones are
+    re-queued with exponential backoff until they run out of attempts.
+    """
+    job = Job.objects.get(pk=pk)
+    try:
+        func = get_job(job.name)
+    except LookupError as exc:
+        Job.objects.filter(pk=pk).update(status=Job.FAILED, locked_at=None, last_error=str(exc))
+        return False
+    try:
+        func(*job.args, **job.kwargs)
+    except Exception:
+        error = traceback.format_exc()
+        if job.attempts < job.max_attempts:
+            logger.warning('Job %s #%s failed (attempt %d), retrying:\n%s', job.name, pk, job.attempts, error)
+            _requeue(pk, last_error=error, run_after=timezone.now() + timedelta(seconds=retry_backoff(func, job.attempts)))
+        else:
+            logger.error('Job %s #%s failed after %d attempts:\n%s', job.name, pk, job.attempts, error)
+            Job.objects.filter(pk=pk).update(status=Job.FAILED, locked_at=None, last_error=error)
+        return False
+    Job.objects.filter(pk=pk).delete()
+    return True
+
+
+def run_in_process(pk):
+    """
+    Entry point for process-pool workers: makes sure Django is set up in the child process.
+    """
+    if not apps.ready:
+        django.setup()
+    try:
+        return execute_job(pk)
+    finally:
+        close_old_connections()
@@ -7,4 +7,5 @@ class ProfilesConfig(AppConfig):
 
 
     def ready(self):
-        import profiles.signals # register the signals
\ No newline at end of file
+        import profiles.signals # register the signals
+        import profiles.schema # register the OpenAPI auth scheme of CachedJWTAuthentication
\ No newline at end of file
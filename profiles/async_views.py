@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.exceptions import NotFound
+
+from blog_project.async_api import AsyncAPIView
+from .models import Profile
+from .serializers import ProfileSerializer
+
+
+def profile_cache_key(username):
+    return f'profiles:profile:{username}'
+
+
+class AsyncProfileDetailView(AsyncAPIView):
+    """
+    GET /api/profiles/async/profiles/{username}/ - async variant of ProfileViewSet.retrieve.
+    The payload is cached and evicted by profiles.signals when the profile or its user changes.
+    """
+
+    async def get(self, request, username):
+        key = profile_cache_key(username)
+        data = await cache.aget(key)
+        if data is None:
+            try:
+                profile = await Profile.objects.select_related('user').aget(user__username=username)
+            except Profile.DoesNotExist:
+                raise NotFound('No Profile matches the given query.')
+            data = ProfileSerializer(profile).data
+            await cache.aset(key, data, getattr(settings, 'BLOG_ASYNC_CACHE_TIMEOUT', 30))
+        return self.respond(data)
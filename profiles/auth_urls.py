@@ -0,0 +1,13 @@
+from rest_framework.routers import DefaultRouter
+from .views import UserViewSet
+
+#* replaces djoser.urls: same routes, with soft account deletion
+router = DefaultRouter()
+router.register(r'users', UserViewSet)
+urlpatterns = router.urls
+
+# Available routes (see djoser's documentation):
+# POST /users/ - Register
+# GET, PUT, PATCH, DELETE /users/me/ - Current user; DELETE deactivates the account and purges its content in the background
+# GET, PUT, PATCH, DELETE /users/{id}/ - A user (admins, or the user themselves)
+# POST /users/activation/, /users/set_password/, /users/reset_password/, ... - Account management
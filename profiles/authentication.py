@@ -0,0 +1,137 @@
+import copy
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+
+def _auth_cache_settings():
+    return {
+        'CACHE_ALIAS': 'default',
+        'TIMEOUT': 300,
+        **getattr(settings, 'AUTH_USER_CACHE', {}),
+    }
+
+
+def user_cache_key(user_id):
+    return f'auth:user:{user_id}'
+
+
+def user_cache():
+    """
+    The cache holding resolved users, or None when AUTH_USER_CACHE['CACHE_ALIAS'] is local to
+    the process: an eviction would then only reach the worker that saved the user, and the
+    others would keep authenticating a deactivated user until the entry expired.
+    """
+    cache = caches[_auth_cache_settings()['CACHE_ALIAS']]
+    if isinstance(cache, (LocMemCache, DummyCache)):
+        return None
+    return cache
+
+
+def _cache_entry(user, password_hash):
+    """
+    What is cached for `user`: a copy without the password hash, which is left deferred (read
+    from the database only if something asks for it, e.g. a password change), plus the digest
+    the revoke-token check compares against.
+    """
+    cached = copy.copy(user)
+    cached.__dict__.pop('password', None)
+    return cached, password_hash
+
+
+def invalidate_cached_user(user_id):
+    cache = user_cache()
+    if cache is not None:
+        cache.delete(user_cache_key(user_id))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that keeps the resolved User in the cache instead of selecting it
+    on every request.
+
+    Entries live for the remaining lifetime of the token (capped by AUTH_USER_CACHE['TIMEOUT'])
+    and are deleted whenever the User is saved or deleted (see profiles.signals), so
+    deactivation and password changes take effect on the next request. The same
+    is_active / revoke-claim checks as JWTAuthentication run against the cached user.
+    Users are only cached in a cache shared by all workers (see `user_cache`); with a
+    process-local one every request selects the user, like JWTAuthentication.
+    The password hash itself is never written to the cache (see `_cache_entry`).
+    """
+
+    def _user_id(self, validated_token):
+        try:
+            return validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+    def _cache_timeout(self, validated_token):
+        timeout = _auth_cache_settings()['TIMEOUT']
+        if 'exp' in validated_token:
+            timeout = min(timeout, int(validated_token['exp'] - timezone.now().timestamp()))
+        return timeout
+
+    def _check_user(self, user, password_hash, validated_token):
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != password_hash:
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code="password_changed"
+                )
+        return user
+
+    def get_user(self, validated_token):
+        user_id = self._user_id(validated_token)
+        cache = user_cache()
+        key = user_cache_key(user_id)
+        entry = cache.get(key) if cache is not None else None
+        if entry is None:
+            try:
+                user = self.user_model.objects.get(**{api_settings.USER_ID_FIELD: user_id})
+            except self.user_model.DoesNotExist:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found")
+            entry = user, get_md5_hash_password(user.password)
+            timeout = self._cache_timeout(validated_token)
+            if cache is not None and timeout > 0:
+                cache.set(key, _cache_entry(*entry), timeout)
+        return self._check_user(*entry, validated_token)
+
+    async def aauthenticate(self, request):
+        """
+        Async counterpart of `authenticate` for plain Django async views: the token is
+        validated in-line and the user comes from the async cache/ORM APIs.
+        """
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token):
+        user_id = self._user_id(validated_token)
+        cache = user_cache()
+        key = user_cache_key(user_id)
+        entry = await cache.aget(key) if cache is not None else None
+        if entry is None:
+            try:
+                user = await self.user_model.objects.aget(**{api_settings.USER_ID_FIELD: user_id})
+            except self.user_model.DoesNotExist:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found")
+            entry = user, get_md5_hash_password(user.password)
+            timeout = self._cache_timeout(validated_token)
+            if cache is not None and timeout > 0:
+                await cache.aset(key, _cache_entry(*entry), timeout)
+        return self._check_user(*entry, validated_token)
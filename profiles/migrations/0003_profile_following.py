@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-19 08:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0002_export_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='following',
+            field=models.ManyToManyField(blank=True, related_name='followers', to='profiles.profile'),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='timeline_read_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
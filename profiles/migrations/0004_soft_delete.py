@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-19 08:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0003_profile_following'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, db_index=True, editable=False, null=True),
+        ),
+    ]
@@ -1,6 +1,12 @@
 from django.db import models
 from django.contrib.auth.models import User
 
+class LiveProfileManager(models.Manager):
+    """Hides the profiles of users whose account is being deleted (see blog.deletion)."""
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at__isnull=True)
+
+
 # Create your models here.
 def avatar_upload_path(instance, filename):
     return f'avatars/{instance.user.username}/{filename}'
@@ -10,7 +16,13 @@ class Profile(models.Model):
     bio = models.TextField(blank=True, null=True)
     avatar = models.ImageField(upload_to=avatar_upload_path, blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True) #* incremental exports filter on it
+    following = models.ManyToManyField('self', symmetrical=False, related_name='followers', blank=True)
+    timeline_read_at = models.DateTimeField(null=True, blank=True, editable=False) #* last home timeline read, see blog.timelines
+    deleted_at = models.DateTimeField(null=True, blank=True, editable=False, db_index=True) #* account deletion requested, see blog.deletion
+
+    objects = LiveProfileManager()
+    all_objects = models.Manager()
 
     def __str__(self):
         return self.user.username
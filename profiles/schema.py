@@ -0,0 +1,9 @@
+"""
+drf-spectacular extensions for the profiles app (imported from ProfilesConfig.ready).
+"""
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+
+
+class CachedJWTScheme(SimpleJWTScheme):
+    """Documents CachedJWTAuthentication as the same `jwtAuth` bearer scheme as JWTAuthentication."""
+    target_class = 'profiles.authentication.CachedJWTAuthentication'
@@ -1,7 +1,10 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.contrib.auth.models import User
 from .models import Profile
+from django.core.cache import cache
+from .authentication import invalidate_cached_user
+from .async_views import profile_cache_key
 
 @receiver(post_save, sender=User)
 def create_profile(sender, instance, created, **kwargs):
@@ -43,3 +46,18 @@ def save_profile(sender, instance, **kwargs):
         )
 
 
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def evict_cached_user(sender, instance, **kwargs):
+    """
+    Drops the user cached by CachedJWTAuthentication, so changes such as deactivation
+    or a new password apply to the very next authenticated request.
+    """
+    invalidate_cached_user(instance.pk)
+    cache.delete(profile_cache_key(instance.username))
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+def evict_cached_profile(sender, instance, **kwargs):
+    cache.delete(profile_cache_key(instance.user.username))
@@ -1,3 +1,80 @@
-from django.test import TestCase
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .authentication import user_cache, user_cache_key
+
+SHARED_CACHE = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'shared': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': tempfile.mkdtemp()},
+}
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('reader')
+        self.headers = {'Authorization': f'Bearer {AccessToken.for_user(self.user)}'}
+
+    def get(self):
+        return self.client.get('/api/blog/categories/', headers=self.headers)
+
+    def test_process_local_cache_is_not_used(self):
+        self.assertIsNone(user_cache())
+        self.assertEqual(self.get().status_code, 200)
+        User.objects.filter(pk=self.user.pk).update(is_active=False) #* no signal: another worker's write
+        self.assertEqual(self.get().status_code, 401)
+
+    @override_settings(CACHES=SHARED_CACHE, AUTH_USER_CACHE={'CACHE_ALIAS': 'shared'})
+    def test_shared_cache_skips_the_user_query_and_is_evicted_on_save(self):
+        user_cache().clear()
+        self.get()
+        self.assertIsNotNone(user_cache().get(user_cache_key(self.user.pk)))
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.get().status_code, 200)
+        self.assertFalse([query for query in queries.captured_queries if 'auth_user' in query['sql']])
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.get().status_code, 401)
+
+    @override_settings(CACHES=SHARED_CACHE, AUTH_USER_CACHE={'CACHE_ALIAS': 'shared'})
+    def test_password_hash_is_not_cached(self):
+        self.user.set_password('s3cret-pass')
+        self.user.save()
+        user_cache().clear()
+        self.headers = {'Authorization': f'Bearer {AccessToken.for_user(self.user)}'}
+        self.assertEqual(self.get().status_code, 200)
+        cached, _ = user_cache().get(user_cache_key(self.user.pk))
+        self.assertNotIn('password', cached.__dict__)
+        for path in Path(settings.CACHES['shared']['LOCATION']).iterdir():
+            self.assertNotIn(self.user.password.encode(), path.read_bytes())
+        self.assertTrue(cached.check_password('s3cret-pass')) #* deferred: loaded when something needs it
+
+
+    @override_settings(CACHES=SHARED_CACHE, AUTH_USER_CACHE={'CACHE_ALIAS': 'shared'})
+    @patch.object(jwt_settings, 'CHECK_REVOKE_TOKEN', True) #* simplejwt does not reload on override_settings
+    def test_revoke_check_uses_the_cached_digest(self):
+        user_cache().clear()
+        self.headers = {'Authorization': f'Bearer {AccessToken.for_user(self.user)}'}
+        self.assertEqual(self.get().status_code, 200)
+        self.assertEqual(self.get().status_code, 200) #* from the cache
+        self.user.set_password('changed')
+        self.user.save()
+        self.assertEqual(self.get().status_code, 401)
+
+
+class SchemaTests(TestCase):
+    def test_cached_jwt_authentication_is_documented_as_jwt_auth(self):
+        with tempfile.NamedTemporaryFile(suffix='.yml') as schema:
+            call_command('spectacular', '--file', schema.name)
+            document = schema.read().decode()
+        self.assertIn('jwtAuth:', document)
+        self.assertIn('- jwtAuth: []', document)
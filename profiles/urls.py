@@ -1,14 +1,18 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import ProfileViewSet
+from .async_views import AsyncProfileDetailView
 
 router = DefaultRouter()
 router.register(r'profiles', ProfileViewSet, basename='profile')
 urlpatterns = [
     path('', include(router.urls)),
+    path('async/profiles/<str:username>/', AsyncProfileDetailView.as_view(), name='profile-detail-async'),
 ]
 
 # Available routes:
 # GET /profiles/ - List all profiles (authenticated users only)
 # GET /profiles/{username}/ - Retrieve a specific profile (authenticated users only)
 # PUT /profiles/{username}/ - Update/Partially update a specific profile (authenticated users only, owner only)
+# POST /profiles/{username}/follow/ - Toggle following a user (authenticated users only)
+# GET /async/profiles/{username}/ - ASGI-native variant of the profile retrieve (authenticated users only)
@@ -1,11 +1,15 @@
 from rest_framework import generics, permissions, viewsets, status
 from rest_framework.response import Response
+from rest_framework.decorators import action
 from django.shortcuts import get_object_or_404
 from django.contrib.auth.models import User
 from .models import Profile
 from .serializers import ProfileSerializer, UserSerializer
 from .permissions import IsOwnerOrReadOnly
 from drf_spectacular.utils import extend_schema, extend_schema_view
+from djoser.views import UserViewSet as DjoserUserViewSet
+from blog.timelines import invalidate_timeline
+from blog.deletion import soft_delete_user
 
 # Create your views here.
 # class ProfileListView(generics.ListAPIView):
@@ -47,13 +51,19 @@ from drf_spectacular.utils import extend_schema, extend_schema_view
         tags=['Profiles'],
         summary='Update a profile (PUT/PATCH)',
         description='Update the authenticated user\'s profile. Supports both full (PUT) and partial (PATCH) updates. Only the owner can modify.'
+    ),
+    follow=extend_schema(
+        tags=['Profiles'],
+        summary='Toggle follow',
+        description='Follow this user if not already followed, unfollow otherwise. Their posts show up in your home timeline (/api/blog/feed/). Returns the new follower count.',
+        request=None
     )
 )
 class ProfileViewSet(viewsets.ViewSet):
     """Profiles endpoints (tag: Profiles)."""
     lookup_field = 'username'
     def get_permissions(self):
-        if self.action in ['list', 'retrieve']:
+        if self.action in ['list', 'retrieve', 'follow']:
             permission_classes = [permissions.IsAuthenticated]
         elif self.action in ['update', 'partial_update']:
             permission_classes = [permissions.IsAuthenticated, IsOwnerOrReadOnly]
@@ -77,4 +87,28 @@ class ProfileViewSet(viewsets.ViewSet):
         serializer = ProfileSerializer(profile, data=request.data, partial=True)
         serializer.is_valid(raise_exception=True)
         serializer.save()
-        return Response(serializer.data)
\ No newline at end of file
+        return Response(serializer.data)
+
+    @action(detail=True, methods=['post'])
+    def follow(self, request, username=None):
+        profile = get_object_or_404(Profile, user__username=username)
+        if profile.user_id == request.user.id: # type: ignore
+            return Response({'detail': 'You cannot follow yourself.'}, status=status.HTTP_400_BAD_REQUEST)
+        follower = request.user.profile
+        if follower.following.filter(pk=profile.pk).exists():
+            follower.following.remove(profile)
+            result, response_status = 'unfollowed', status.HTTP_200_OK
+        else:
+            follower.following.add(profile)
+            result, response_status = 'followed', status.HTTP_201_CREATED
+        invalidate_timeline(request.user) #* rebuilt with the new set of authors on the next read
+        return Response({'status': result, 'followers_count': profile.followers.count()}, status=response_status)
+
+
+#* Djoser's /api/auth/users/ endpoints, except that deleting an account (DELETE /users/me/ or
+#* /users/{id}/) deactivates it and hides its content at once, leaving the cascade over the
+#* user's posts, comments and likes to the background purge (see blog.deletion).
+#* (A comment rather than a docstring: drf-spectacular would copy it into every auth operation.)
+class UserViewSet(DjoserUserViewSet):
+    def perform_destroy(self, instance):
+        soft_delete_user(instance)